@@ -0,0 +1,249 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+# Playwright's own default; callers shorten it per page, so it is restored before a page is reused
+DEFAULT_TIMEOUT_MS = 30000
+
+# Live JS heap of a page's renderer; Chromium only, so other engines report 0
+HEAP_JS = "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+
+
+class BrowserPool:
+    launch_count = 0  # Chromium launches across every pool in this process
+
+    def __init__(self, max_pages=8, headless=True, cache=None, request_filter=None, max_uses=100, max_heap_mb=256):
+        self.max_pages = max_pages  # Upper bound on live contexts/pages
+        self.headless = headless
+        # Long runs: a context is closed instead of recycled after this many borrows or past this JS heap,
+        # so documents, handles and caches it retained are freed (None disables either check)
+        self.max_uses = max_uses
+        self.max_heap_bytes = max_heap_mb * 1024 * 1024 if max_heap_mb else None
+        self.cache = cache  # Optional ResponseCache serving document requests
+        self.request_filter = request_filter  # Optional RequestFilter applied by profile
+        self._playwright = None
+        self._browser = None
+        self._generation = 0  # Bumped on every (re)launch to invalidate stale contexts
+        self._idle = {}  # Request profile -> recycled (generation, context, page, uses) entries
+        self._slots = None
+        self._launch_lock = None
+        self._held = []  # Slot acquisitions held back while throttled
+
+        # Counters used to show launches stay O(workers) rather than O(listings)
+        self.stats = {
+            'launches': 0,
+            'hits': 0,
+            'misses': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'retired': 0,
+            'restarts': 0,
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Method to start playwright and launch the long-lived browser
+    async def start(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pages)
+            self._launch_lock = asyncio.Lock()
+        await self._ensure_browser()
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                print("Browser disconnected, relaunching.")
+                self._idle = {}
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._generation += 1
+            self.stats['launches'] += 1
+            BrowserPool.launch_count += 1
+            return self._browser
+
+    # Method to check the browser is alive, relaunching it if it is not
+    async def health_check(self):
+        if self._slots is None:
+            await self.start()
+            return True
+        healthy = self._browser is not None and self._browser.is_connected()
+        if not healthy:
+            await self._ensure_browser()
+        return healthy
+
+    def _is_reusable(self, generation, page):
+        return (
+            generation == self._generation
+            and self._browser is not None
+            and self._browser.is_connected()
+            and not page.is_closed()
+        )
+
+    def _idle_count(self):
+        return sum(len(entries) for entries in self._idle.values())
+
+    async def _acquire(self, profile):
+        idle = self._idle.get(profile, [])
+        while idle:
+            generation, context, page, uses = idle.pop()
+            if self._is_reusable(generation, page):
+                self.stats['hits'] += 1
+                return generation, context, page, uses
+            self.stats['discarded'] += 1
+            await self._close_context(context)
+
+        # Keep the pool bounded when idle pages of another profile are holding the room
+        if self._idle_count() >= self.max_pages:
+            for entries in self._idle.values():
+                if entries:
+                    _, stale_context, _, _ = entries.pop(0)
+                    self.stats['discarded'] += 1
+                    await self._close_context(stale_context)
+                    break
+
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        page = await context.new_page()
+        await self._prepare(page, profile)
+        self.stats['misses'] += 1
+        return self._generation, context, page, 0
+
+    # Method to install per-page routing once, when a page is created
+    async def _prepare(self, page, profile):
+        if self.cache is not None:
+            await self.cache.attach(page)
+        # Registered last so it sees requests first and blocked ones never reach the cache
+        if self.request_filter is not None:
+            await self.request_filter.attach(page, profile)
+
+    async def _release(self, generation, context, page, uses, healthy, profile):
+        if healthy and self._is_reusable(generation, page) and self._idle_count() < self.max_pages:
+            if await self._worn_out(page, uses):
+                self.stats['retired'] += 1
+                await self._close_context(context)
+                return
+            # A deadline-derived timeout left on the page would cut the next borrower's waits short
+            page.set_default_timeout(DEFAULT_TIMEOUT_MS)
+            page.set_default_navigation_timeout(DEFAULT_TIMEOUT_MS)
+            self._idle.setdefault(profile, []).append((generation, context, page, uses))
+            self.stats['recycled'] += 1
+            return
+        self.stats['discarded'] += 1
+        await self._close_context(context)
+
+    # Method to tell whether a context has been borrowed too often or holds too much JS heap
+    async def _worn_out(self, page, uses):
+        if self.max_uses and uses >= self.max_uses:
+            return True
+        if self.max_heap_bytes:
+            try:
+                return await page.evaluate(HEAP_JS) >= self.max_heap_bytes
+            except Exception:
+                return True  # A page that cannot answer is not worth keeping
+        return False
+
+    async def _close_context(self, context):
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Error while closing browser context: {e}")
+
+    # Borrow a page set up for a request profile; it is returned (or discarded on error) on exit
+    @asynccontextmanager
+    async def page(self, profile=None):
+        if self._slots is None:
+            await self.start()
+
+        async with self._slots:
+            generation, context, page, uses = await self._acquire(profile)
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                await self._release(generation, context, page, uses + 1, healthy, profile)
+
+    # Method to let at most `pages` pages be open at once; the other slots are taken as pages finish
+    def throttle(self, pages):
+        if self._slots is None:
+            return
+        held_back = self.max_pages - max(1, pages)
+        while len(self._held) < held_back:
+            self._held.append(asyncio.ensure_future(self._slots.acquire()))
+
+    def unthrottle(self):
+        for acquisition in self._held:
+            if acquisition.done() and not acquisition.cancelled():
+                self._slots.release()
+            else:
+                acquisition.cancel()
+        self._held = []
+
+    def open_pages(self):
+        return self.max_pages - len([acquisition for acquisition in self._held if acquisition.done()])
+
+    # Method to close idle contexts so their renderers exit; the next borrow opens a fresh one
+    async def close_idle(self):
+        idle, self._idle = self._idle, {}
+        for entries in idle.values():
+            for _, context, _, _ in entries:
+                self.stats['discarded'] += 1
+                await self._close_context(context)
+
+    # Method to relaunch Chromium, returning all of its memory to the OS. Pages in use fail and are
+    # retried by their callers; their contexts belong to the old generation and are not recycled.
+    async def restart(self):
+        if self._slots is None:
+            return
+        async with self._launch_lock:
+            idle, self._idle = self._idle, {}
+            browser, self._browser = self._browser, None
+            self._generation += 1
+        for entries in idle.values():
+            for _, context, _, _ in entries:
+                await self._close_context(context)
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error while closing browser: {e}")
+        self.stats['restarts'] += 1
+        await self._ensure_browser()
+
+    # Method to close every pooled context, the browser and playwright
+    async def close(self):
+        self.unthrottle()
+        for entries in self._idle.values():
+            for _, context, _, _ in entries:
+                await self._close_context(context)
+        self._idle = {}
+
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"Error while closing browser: {e}")
+            self._browser = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def report(self):
+        stats = self.stats
+        print(
+            f"Browser pool: {stats['launches']} launches, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['recycled']} recycled, {stats['discarded']} discarded, "
+            f"{stats['retired']} retired for age or heap, {stats['restarts']} restarts."
+        )
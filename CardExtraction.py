@@ -0,0 +1,77 @@
+from NextData import build_listing_index, parse_next_data, parse_next_data_html
+
+CARD_SELECTOR = '.StackedCard_card__Kvggc'
+
+# Declarative card spec shared by the listing scrapers:
+# field -> (selector inside the card, or None for the card itself; attribute, or None for innerText)
+CARD_FIELDS = {
+    'href': (None, 'href'),
+    'type': ('.text-6-med.text-neutral_600.styles_category__NQAci', None),
+    'title': ('.text-4-med.text-neutral_900.styles_title__l5TTA', None),
+    'description': ('.text-5-regular.text-neutral_500.StackedCard_description__aXpyG', None),
+    'tail': ('.styles_tail__82mnX p.text-6-med.text-neutral_600', None),
+    'date_published': ('[data-testid="date_published"]', 'content'),
+}
+
+# Runs in the page and returns one plain record per card
+EXTRACT_CARDS_JS = """
+(cards, fields) => cards.map(card => {
+    const record = {};
+    for (const [name, [selector, attribute]] of Object.entries(fields)) {
+        const element = selector ? card.querySelector(selector) : card;
+        if (!element) {
+            record[name] = null;
+        } else {
+            record[name] = attribute ? element.getAttribute(attribute) : element.innerText;
+        }
+    }
+    return record;
+})
+"""
+
+
+# A listing page that loaded but never showed its cards; retried by reloading the page under the
+# 'selector' budget rather than the 'navigation' one
+class CardsNotReady(Exception):
+    pass
+
+
+# Method to name the RetryPolicy budget a listing page failure is charged to
+def listing_failure(error):
+    return 'selector' if isinstance(error, CardsNotReady) else 'navigation'
+
+
+# Method to pull every card field for the whole page in one evaluation
+async def extract_cards(page, fields=None):
+    return await page.eval_on_selector_all(CARD_SELECTOR, EXTRACT_CARDS_JS, fields or CARD_FIELDS)
+
+
+# Method to turn a relative card href into an absolute link
+def build_link(href, base_url):
+    return f"{base_url}{href}" if href else None
+
+
+# Method to release element handles once they are read. A handle otherwise stays referenced until
+# its context closes, and recycled pages would accumulate them page after page.
+async def dispose_handles(*handles):
+    for handle in handles:
+        if handle is None:
+            continue
+        try:
+            await handle.dispose()
+        except Exception:
+            pass  # Already gone with its page or document
+
+
+# Method to build the page's listing index from its embedded __NEXT_DATA__ JSON
+async def read_listing_index(page):
+    # query_selector does not wait, so a page without the script costs nothing extra
+    script = await page.query_selector('script#__NEXT_DATA__')
+    if script is not None:
+        try:
+            next_data = parse_next_data(await script.text_content())
+        finally:
+            await dispose_handles(script)
+    else:
+        next_data = parse_next_data_html(await page.content())
+    return build_listing_index(next_data)
@@ -0,0 +1,88 @@
+import json
+import os
+
+
+class CheckpointJournal:
+    def __init__(self, path, run_key, fsync=True):
+        self.path = path
+        self.run_key = run_key  # Identifies the run (day, categories); a journal for another run is discarded
+        self.fsync = fsync  # Force each finished page to disk, not just to the OS buffers
+        self.completed = {}  # (category, page) -> journal entry
+        self.resumed = 0  # Pages replayed from the journal instead of being scraped
+        self._handle = None
+
+    # Method to load finished pages from an earlier, interrupted run and open the journal for appends
+    def open(self):
+        entries, valid_bytes = self._read()
+        if entries and entries[0].get('run') == self.run_key:
+            for entry in entries[1:]:
+                self.completed[(entry['category'], entry['page'])] = entry
+            mode = 'a'
+            # Cut off a torn last line so new entries start on a clean line
+            with open(self.path, 'r+b') as handle:
+                handle.truncate(valid_bytes)
+            if self.completed:
+                print(f"Resuming from checkpoint {self.path}: {len(self.completed)} pages already done.")
+        else:
+            mode = 'w'
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handle = open(self.path, mode, encoding='utf-8')
+        if mode == 'w':
+            self._append({'run': self.run_key})
+        return self
+
+    # Method to return the intact entries and the byte length they cover
+    def _read(self):
+        if not os.path.exists(self.path):
+            return [], 0
+        entries = []
+        valid_bytes = 0
+        with open(self.path, 'rb') as handle:
+            for line in handle:
+                if not line.endswith(b'\n'):
+                    break  # A torn last line from a crash; that page is simply redone
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+        return entries, valid_bytes
+
+    def _append(self, entry):
+        self._handle.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+
+    def is_done(self, category, page):
+        return (category, page) in self.completed
+
+    def entry(self, category, page):
+        self.resumed += 1
+        return self.completed[(category, page)]
+
+    # Method to journal one finished page as a single line, so it is either fully recorded or redone
+    def record_page(self, category, page, records, seen_ids, exhausted):
+        entry = {
+            'category': category,
+            'page': page,
+            'records': records,  # Kept records, display fields only; typed columns are re-derived
+            'seen': seen_ids,  # Listing ids the page claimed or repeated, replayed into the dedup index
+            'exhausted': exhausted,  # Pagination stopped after this page
+        }
+        self._append(entry)
+        self.completed[(category, page)] = entry
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    # Method to drop the journal once the run finished, so the next run starts fresh
+    def complete(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from datetime import datetime
+from BrowserPool import BrowserPool
+from HouseScraper import HouseScraping
+from RequestFilter import RequestFilter
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFailed(Exception):
+    pass
+
+
+class CrawlJobManager:
+    def __init__(self, urls, interval=1800, max_age=3600, client=None):
+        self.urls = urls  # Listing pages crawled by every job
+        self.interval = interval  # Seconds between scheduled crawls (None disables the schedule)
+        self.max_age = max_age  # Snapshots older than this trigger a background refresh
+        self.snapshot = []  # Results of the last successful crawl
+        self.refreshed_at = None
+        self.last_error = None
+        self.stats = {'crawls': 0, 'coalesced': 0, 'failures': 0, 'daemon_crawls': 0}
+        self.client = client  # ScraperClient of a warm ScraperDaemon; crawls run in-process without one
+        self.pool = None
+        self._refresh_task = None
+        self._schedule_task = None
+
+    # Method to open the shared browser (unless a daemon has one warm) and start the schedule
+    async def start(self):
+        if self.client is not None and await self.client.available_async():
+            logger.info("Submitting crawls to the scraper daemon.")
+        else:
+            await self._start_pool()
+        if self.interval:
+            self._schedule_task = asyncio.create_task(self._schedule())
+
+    async def _start_pool(self):
+        self.pool = BrowserPool(request_filter=RequestFilter())
+        await self.pool.start()
+
+    async def stop(self):
+        for task in (self._schedule_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def _schedule(self):
+        while True:
+            await asyncio.shield(self.refresh())
+            await asyncio.sleep(self.interval)
+
+    async def _crawl(self):
+        if self.pool is None and self.client is not None:
+            try:
+                properties = await self.client.house(self.urls)
+                self.stats['daemon_crawls'] += 1
+                if self.urls and not properties:
+                    raise CrawlFailed("Every page came back empty from the scraper daemon.")
+                return properties
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"Scraper daemon unavailable, crawling in-process: {e}")
+                await self._start_pool()
+
+        scrapers = [HouseScraping(url, pool=self.pool) for url in self.urls]
+        results = await asyncio.gather(*(scraper.get_property_details() for scraper in scrapers))
+        # HouseScraping gives up quietly with an empty page; that must not pass for a fresh snapshot
+        failed = [f"{scraper.url}: {scraper.error}" for scraper in scrapers if scraper.error]
+        if failed:
+            raise CrawlFailed(f"{len(failed)} of {len(scrapers)} pages failed: {'; '.join(failed)}")
+        properties = [prop for properties in results for prop in properties]
+        if self.urls and not properties:
+            raise CrawlFailed("Every page came back empty.")
+        return properties
+
+    async def _run_refresh(self):
+        self.stats['crawls'] += 1
+        logger.info("Starting property scraping...")
+        try:
+            properties = await self._crawl()
+        except Exception as e:
+            self.stats['failures'] += 1
+            self.last_error = str(e)
+            # The previous snapshot and its refreshed_at stay as they were
+            logger.error(f"Crawl failed, keeping the previous snapshot: {e}", exc_info=True)
+            return self.snapshot
+
+        self.snapshot = properties
+        self.refreshed_at = datetime.now()
+        self.last_error = None
+        logger.info(f"Scraped {len(properties)} properties.")
+        return properties
+
+    # Method to start a crawl, or join the one already running
+    def refresh(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self.stats['coalesced'] += 1
+            return self._refresh_task
+        self._refresh_task = asyncio.create_task(self._run_refresh())
+        return self._refresh_task
+
+    def is_stale(self):
+        if self.refreshed_at is None:
+            return True
+        return (datetime.now() - self.refreshed_at).total_seconds() > self.max_age
+
+    # Method to return the snapshot, waiting only when there has never been one
+    async def get_snapshot(self):
+        if self.refreshed_at is None:
+            # Shielded so a client disconnecting does not cancel a crawl others are waiting on
+            await asyncio.shield(self.refresh())
+            if self.refreshed_at is None:
+                # The first crawl failed; an empty list would pass for "no properties listed"
+                raise CrawlFailed(self.last_error or "The first crawl did not finish.")
+        elif self.is_stale():
+            self.refresh()
+        return self.snapshot
+
+    def status(self):
+        return {
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'stale': self.is_stale(),
+            'refreshing': self._refresh_task is not None and not self._refresh_task.done(),
+            'count': len(self.snapshot),
+            'last_error': self.last_error,
+            **self.stats,
+        }
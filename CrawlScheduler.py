@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import time
+from urllib.parse import urlparse
+
+# Lower runs first: finish the detail pages of listings already found before opening new index pages
+DETAIL_PRIORITY = 0
+PAGE_PRIORITY = 1
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # Tokens added per second
+        self.burst = burst  # Bucket capacity
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    # Method to wait until a request may be sent
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _is_timeout(error):
+    return isinstance(error, asyncio.TimeoutError) or type(error).__name__ == 'TimeoutError'
+
+
+class CrawlScheduler:
+    def __init__(self, rate=4.0, burst=8, initial_concurrency=4, min_concurrency=1, max_concurrency=16,
+                 target_latency=8.0, max_error_rate=0.1, window=10):
+        self.rate = rate  # Requests per second per host
+        self.burst = burst
+        self.limit = initial_concurrency  # Current in-flight limit, adjusted AIMD-style
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency  # Average seconds per task above which we back off
+        self.max_error_rate = max_error_rate  # Error/timeout share above which we back off
+        self.window = window  # Completed tasks per adjustment
+
+        self.active = 0  # Slots taken, including those of workers waiting for their next task
+        self.stats = {
+            'submitted': 0, 'completed': 0, 'errors': 0, 'timeouts': 0,
+            'increases': 0, 'decreases': 0, 'peak_limit': initial_concurrency,
+        }
+        self._buckets = {}
+        self._samples = []  # (ok, seconds) since the last adjustment
+        self._sequence = itertools.count()  # FIFO order within a priority
+        self._queue = None
+        self._capacity = None
+        self._workers = []
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._capacity = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _bucket(self, url):
+        host = urlparse(url).hostname or ''
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    # Method to queue a fetch and wait for its result; factory() creates the coroutine to run
+    async def submit(self, url, factory, priority=PAGE_PRIORITY):
+        if not self._workers:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.stats['submitted'] += 1
+        await self._queue.put((priority, next(self._sequence), url, factory, future))
+        return await future
+
+    async def _worker(self):
+        while True:
+            # Take a slot before dequeuing: a worker waiting for capacity must not hold a task, or a
+            # detail queued meanwhile would run after the page task it should have overtaken
+            async with self._capacity:
+                await self._capacity.wait_for(lambda: self.active < self.limit)
+                self.active += 1
+            try:
+                _, _, url, factory, future = await self._queue.get()
+            except asyncio.CancelledError:
+                async with self._capacity:
+                    self.active -= 1
+                    self._capacity.notify_all()
+                raise
+
+            start = time.perf_counter()
+            try:
+                await self._bucket(url).acquire()
+                result = await factory()
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                self._record(False, time.perf_counter() - start, _is_timeout(e))
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self._record(True, time.perf_counter() - start, False)
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                async with self._capacity:
+                    self.active -= 1
+                    self._capacity.notify_all()
+                self._queue.task_done()
+
+    # Method to adjust the in-flight limit: +1 on a healthy window, halve on errors or slowness
+    def _record(self, ok, seconds, timeout):
+        self.stats['completed'] += 1
+        if not ok:
+            self.stats['timeouts' if timeout else 'errors'] += 1
+        self._samples.append((ok, seconds))
+        if len(self._samples) < self.window:
+            return
+
+        failures = sum(1 for sample_ok, _ in self._samples if not sample_ok)
+        latency = sum(seconds for _, seconds in self._samples) / len(self._samples)
+        self._samples = []
+
+        if failures / self.window > self.max_error_rate or latency > self.target_latency:
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self.stats['decreases'] += 1
+        elif self.limit < self.max_concurrency:
+            self.limit += 1
+            self.stats['increases'] += 1
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], self.limit)
+
+    def report(self):
+        stats = self.stats
+        print(
+            f"Scheduler: {stats['completed']}/{stats['submitted']} tasks, {stats['errors']} errors, "
+            f"{stats['timeouts']} timeouts, concurrency {self.limit} (peak {stats['peak_limit']}, "
+            f"{stats['increases']} increases, {stats['decreases']} decreases)."
+        )
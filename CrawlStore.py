@@ -0,0 +1,93 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+
+class CrawlStore:
+    def __init__(self, path='crawl_store.sqlite3', ttl_hours=24, busy_timeout=30.0):
+        self.path = path
+        self.ttl = ttl_hours * 3600  # Entries older than this are fetched again
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'changed': 0, 'writes': 0}
+        # Sharded workers share the file; writers wait on each other's locks instead of failing
+        self.connection = sqlite3.connect(path, timeout=busy_timeout)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listings (
+                id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                scraped_at REAL NOT NULL,
+                details TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    # Method to fingerprint the card content a detail refetch would be needed for
+    @staticmethod
+    def fingerprint(card):
+        # The relative date and pin move with time, so they are not part of the content
+        content = [card.get('type'), card.get('title'), card.get('description'), card.get('link')]
+        return hashlib.sha1(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    # Method to fetch stored entries for many ids in one query
+    def lookup(self, ids):
+        ids = [listing_id for listing_id in ids if listing_id]
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        rows = self.connection.execute(
+            f"SELECT id, fingerprint, scraped_at, details FROM listings WHERE id IN ({placeholders})", ids
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    # Method to return stored details for cards that are captured, unchanged and fresh
+    def fresh_details(self, cards):
+        stored = self.lookup([card['id'] for card in cards])
+        cutoff = time.time() - self.ttl
+        fresh = {}
+        for card in cards:
+            entry = stored.get(card['id'])
+            if entry is None:
+                self.stats['misses'] += 1
+            elif entry[0] != self.fingerprint(card):
+                self.stats['changed'] += 1
+            elif entry[1] < cutoff:
+                self.stats['stale'] += 1
+            else:
+                self.stats['hits'] += 1
+                fresh[card['id']] = json.loads(entry[2])
+        return fresh
+
+    # Method to save freshly scraped details for a page of cards in one transaction
+    def upsert_many(self, cards_and_details):
+        now = time.time()
+        rows = [
+            (card['id'], self.fingerprint(card), now, json.dumps(details, ensure_ascii=False))
+            for card, details in cards_and_details
+            if card.get('id') and details
+        ]
+        if not rows:
+            return
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO listings (id, fingerprint, scraped_at, details) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    scraped_at = excluded.scraped_at,
+                    details = excluded.details
+                """,
+                rows,
+            )
+        self.stats['writes'] += len(rows)
+
+    def close(self):
+        self.connection.close()
+
+    def report(self):
+        stats = self.stats
+        print(
+            f"Crawl store: {stats['hits']} reused, {stats['misses']} new, {stats['stale']} stale, "
+            f"{stats['changed']} changed, {stats['writes']} written."
+        )
@@ -0,0 +1,76 @@
+import re
+from datetime import datetime, timedelta
+from NextData import parse_timestamp
+
+# Relative card dates such as "5 hours ago", "1 Day ago" or "an hour ago"
+RELATIVE_PATTERN = re.compile(r'(\d+|an?)\s+(second|minute|hour|day|week|month|year)s?', re.IGNORECASE)
+
+UNIT_SECONDS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 31 * 86400,
+    'year': 366 * 86400,
+}
+
+
+# Method to turn card relative text into (earliest, latest) publish bounds, or None if unknown
+def parse_relative_range(text, now):
+    if not text:
+        return None
+    text = text.strip().lower()
+
+    if text.startswith('pinned'):
+        # A pin shows when it was bumped, not when it was published
+        return None
+    if text in ('just now', 'now'):
+        return now - timedelta(minutes=1), now
+    if text == 'today':
+        return now.replace(hour=0, minute=0, second=0, microsecond=0), now
+    if text == 'yesterday':
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=1), today
+
+    match = RELATIVE_PATTERN.search(text)
+    if not match:
+        return None
+    number = 1 if match.group(1) in ('a', 'an') else int(match.group(1))
+    unit = timedelta(seconds=UNIT_SECONDS[match.group(2)])
+    # "N units ago" is shown for anything between N and N + 1 units old
+    return now - unit * (number + 1), now - unit * number
+
+
+class DateWindow:
+    def __init__(self, start, end):
+        self.start = start  # Inclusive
+        self.end = end  # Exclusive
+
+    @classmethod
+    def yesterday(cls, now=None):
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return cls(today - timedelta(days=1), today)
+
+    def contains(self, moment):
+        return self.start <= moment < self.end
+
+    # Method to place a card relative to the window: 'inside', 'older', 'newer' or 'unknown'
+    def classify(self, relative_text=None, date_published=None, now=None):
+        published = parse_timestamp(date_published)
+        if published:
+            earliest = latest = published
+        else:
+            bounds = parse_relative_range(relative_text, now or datetime.now())
+            if bounds is None:
+                return 'unknown'
+            earliest, latest = bounds
+
+        if latest < self.start:
+            return 'older'
+        if earliest >= self.end:
+            return 'newer'
+        return 'inside'
+
+    def __repr__(self):
+        return f"DateWindow({self.start:%Y-%m-%d %H:%M}, {self.end:%Y-%m-%d %H:%M})"
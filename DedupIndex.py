@@ -0,0 +1,76 @@
+class DedupIndex:
+    def __init__(self):
+        self.first_seen = {}  # Listing id -> (category, page) whose record keeps it
+        self.also_seen = {}  # Listing id -> later (category, page) sightings merged into that record
+        self.saved_fetches = 0  # Detail fetches skipped because the listing was already claimed
+        self.released = 0  # Claims given up after a failed detail fetch
+
+    # Method to claim a listing for a page; False means an earlier page already has it.
+    # `fetch=False` claims records that are already fetched, so no fetch is counted as saved.
+    # Category tasks share one event loop thread and there is no await between the check and
+    # the insert, so concurrent categories cannot both claim the same id.
+    def claim(self, listing_id, category, page, fetch=True):
+        if listing_id is None:
+            return True  # Without an id there is nothing to match on
+        if listing_id not in self.first_seen:
+            self.first_seen[listing_id] = (category, page)
+            return True
+
+        sighting = (category, page)
+        if sighting != self.first_seen[listing_id]:
+            sightings = self.also_seen.setdefault(listing_id, [])
+            if sighting not in sightings:
+                sightings.append(sighting)
+        if fetch:
+            self.saved_fetches += 1
+        return False
+
+    # Method to give up a page's claim after its detail fetch failed, so the next page listing it
+    # fetches it instead; sightings that deferred to the failed page stay recorded against the listing
+    def release(self, listing_id, category, page):
+        if listing_id is not None and self.first_seen.get(listing_id) == (category, page):
+            del self.first_seen[listing_id]
+            self.released += 1
+
+    # Method to pick the ids a page still holds a sighting of: the ones it claimed and kept, and the ones
+    # it deferred to another page. Claims released after a failed fetch are left out, so replaying them
+    # from a checkpoint cannot take a listing away from the page that fetched it instead.
+    def held_by(self, listing_ids, category, page):
+        sighting = (category, page)
+        return [
+            listing_id for listing_id in listing_ids
+            if self.first_seen.get(listing_id) == sighting or sighting in self.also_seen.get(listing_id, ())
+        ]
+
+    # Method to keep only the cards this page claims, before their detail pages are fetched
+    def select(self, cards, category, page):
+        return [card for card in cards if self.claim(card['id'], category, page)]
+
+    # Method to replay a page's sightings from a checkpoint; nothing is fetched, so none are counted as saved
+    def replay(self, listing_ids, category, page):
+        for listing_id in listing_ids:
+            self.claim(listing_id, category, page, fetch=False)
+
+    # Method to describe the extra places a listing appeared, e.g. "Land p2; Farms p1"
+    def provenance(self, listing_id):
+        sightings = self.also_seen.get(listing_id)
+        if not sightings:
+            return None
+        return '; '.join(f"{category} p{page}" if page else category for category, page in sightings)
+
+    # Method to fold in the repeat sightings another process recorded
+    def merge(self, also_seen):
+        for listing_id, sightings in also_seen.items():
+            known = self.also_seen.setdefault(listing_id, [])
+            for category, page in sightings:
+                if (category, page) not in known:
+                    known.append((category, page))
+
+    def duplicates(self):
+        return sum(len(sightings) for sightings in self.also_seen.values())
+
+    def report(self):
+        print(
+            f"Dedup index: {len(self.first_seen)} unique listings, {self.duplicates()} repeat sightings merged, "
+            f"{self.saved_fetches} detail fetches saved, {self.released} claims released after failed fetches."
+        )
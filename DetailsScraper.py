@@ -1,120 +1,269 @@
 import asyncio
-from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
 import nest_asyncio
 import re
 from datetime import datetime, timedelta
 import json
+from BrowserPool import BrowserPool
+from CardExtraction import (
+    CARD_SELECTOR, CardsNotReady, build_link, dispose_handles, extract_cards, listing_failure, read_listing_index,
+)
+from RetryPolicy import RetryPolicy
+from CrawlScheduler import DETAIL_PRIORITY, PAGE_PRIORITY
+from Fetchers import PageValidationError, build_fetchers, fetch_with_fallback
+from Metrics import metrics
+from Readiness import PageReadiness
+from RequestFilter import RequestFilter
+from NextData import NextDataExtractor, parse_next_data, parse_timestamp
+from Records import PropertyRecord
 
 # Allow nested event loops (useful in Jupyter)
 nest_asyncio.apply()
 
 class DetailsScraping:
-    def __init__(self, url, retries=3):
+    def __init__(self, url, retries=3, pool=None, max_concurrency=4, fetchers=None,
+                 base_url='https://www.q84sale.com', date_window=None, store=None, scheduler=None,
+                 retry_policy=None, dedup=None, source=None, readiness=None):
         self.url = url
         self.retries = retries  # Retry count for robustness
+        # Per-operation retry budgets; only the failing page or card is retried
+        self.retry_policy = retry_policy or RetryPolicy(budgets={'navigation': retries})
+        self.pool = pool  # Shared BrowserPool; a private one is opened when None
+        self.fetchers = fetchers or build_fetchers()  # Detail page backends, tried in order
+        self.base_url = base_url  # Site root used to build card links
+        self.max_concurrency = max_concurrency  # Detail pages in flight per listing page
+        self.errors = []  # Per-card detail failures: {'link': ..., 'error': ...}
+        self.extractor = NextDataExtractor()
+        self.date_window = date_window  # Only fetch details for cards that may fall inside it
+        self.skipped = 0  # Cards dropped before their detail page was fetched
+        self.page_exhausted = False  # True when every unpinned card is older than the window
+        self.store = store  # CrawlStore of listings already captured by earlier runs
+        self.scheduler = scheduler  # Shared CrawlScheduler; fetches run directly when None
+        self.dedup = dedup  # Run-wide DedupIndex; listings claimed by another page are not fetched again
+        self.source = source or (url, None)  # (category, page) recorded as this page's provenance
+        self.duplicates = 0  # Cards dropped because another page already claimed them
+        self.seen_ids = []  # Ids of the cards selected on this page, before deduplication
+        self.error = None  # Why the listing page was given up on; its empty result is then not real data
+        # Per-page deadline budgets shared by every wait, and the log of why pages were slow
+        self.readiness = readiness or PageReadiness()
+
+    @asynccontextmanager
+    async def _browser_pool(self):
+        if self.pool is not None:
+            yield self.pool
+            return
+
+        async with BrowserPool(request_filter=RequestFilter()) as pool:
+            self.pool = pool
+            try:
+                yield pool
+            finally:
+                self.pool = None
 
     async def get_property_details(self):
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
-            # Set timeouts
-            page.set_default_navigation_timeout(300000)
-            page.set_default_timeout(300000)  # General timeout
+        async with self._browser_pool() as pool:
+            try:
+                cards = await self.load_cards(pool)  # Card-level data collected from the listing page
+            except Exception as e:
+                print(f"Giving up on {self.url}: {e}")
+                self.error = str(e)
+                cards = []
+
+            # Listings captured by an earlier run and unchanged since are not fetched again
+            stored = self.store.fresh_details(cards) if self.store else {}
+            pending = [card for card in cards if card['id'] not in stored]
+
+            # The listing page is back in the pool before detail pages are opened
+            details = await self.fetch_details([card['link'] for card in pending])
+            fetched = dict(zip(map(id, pending), details))
+            if self.store:
+                self.store.upsert_many(zip(pending, details))
 
             properties = []  # To store scraped properties
+            for card in cards:
+                if card['id'] in stored:
+                    additional_details = self.refresh_relative_date(stored[card['id']])
+                else:
+                    additional_details = fetched[id(card)]
+                if additional_details is None:
+                    if self.dedup is not None:
+                        # Without details the record has no publish date to keep it; another page
+                        # listing the same listing fetches it instead
+                        self.dedup.release(card['id'], *self.source)
+                        continue
+                    additional_details = {}
+                properties.append(self.build_record(card, additional_details))
 
-            for attempt in range(self.retries):
-                try:
-                    # Navigate to the page
-                    await page.goto(self.url, wait_until="domcontentloaded")
-                    await page.wait_for_selector('.StackedCard_card__Kvggc', timeout=300000)
-
-                    # Extract property details
-                    property_cards = await page.query_selector_all('.StackedCard_card__Kvggc')
-                    for card in property_cards:
-                        # Extract property information
-                        link = await self.scrape_link(card)
-                        property_type = await self.scrape_property_type(card)
-                        title = await self.scrape_title(card)
-                        description = await self.scrape_description(card)
-                        pinned_today = await self.scrape_pinned_today(card)
-                        id = await self.scrape_id(link)
-
-                        # Scrape additional details from the property page
-                        additional_details = await self.scrape_additional_details(link)
-
-                        properties.append({
-                            'id': id,
-                            'date_published': additional_details.get('date_published'),
-                            'relative_date': additional_details.get('relative_date'),
-                            'pin': pinned_today,
-                            'type': property_type,
-                            'title': title,
-                            'description': description,
-                            'link': link,
-                            'image': additional_details.get('image'),
-                            'price': additional_details.get('price'),
-                            'address': additional_details.get('address'),
-                            'beds': additional_details.get('beds'),
-                            'area': additional_details.get('area'),
-                            'views_no': additional_details.get('views_no'),  # Added views number here
-                            'submitter': additional_details.get('submitter'),
-                            'ads': additional_details.get('ads'),
-                            'membership': additional_details.get('membership'),
-                            'phone': additional_details.get('phone'),
-                        })
-                    break  # Exit loop if successful
-
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} failed for {self.url}: {e}")
-                    if attempt + 1 == self.retries:
-                        print(f"Max retries reached for {self.url}. Returning partial results.")
-                        break
-                finally:
-                    # Close page between attempts to ensure proper cleanup
-                    await page.close()
-                    if attempt + 1 < self.retries:
-                        page = await browser.new_page()
-
-            await browser.close()
             return properties
 
-    # Method to scrape the link
-    async def scrape_link(self, card):
-        rawlink = await card.get_attribute('href')
-        base_url = 'https://www.q84sale.com'
-        return f"{base_url}{rawlink}" if rawlink else None
-
-    # Method to scrape the property type
-    async def scrape_property_type(self, card):
-        selector = '.text-6-med.text-neutral_600.styles_category__NQAci'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the property title
-    async def scrape_title(self, card):
-        selector = '.text-4-med.text-neutral_900.styles_title__l5TTA'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the property description
-    async def scrape_description(self, card):
-        selector = '.text-5-regular.text-neutral_500.StackedCard_description__aXpyG'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the pin status
-    async def scrape_pinned_today(self, card):
-        selector = '.styles_tail__82mnX p.text-6-med.text-neutral_600'
-        elements = await card.query_selector_all(selector)
-        if elements:
-            pin_text = await elements[0].inner_text()
-            return "Pinned today" if pin_text == "Pinned today" else "Not Pinned"
-        return "Not Pinned"
+    # Method to load the listing page and keep the cards whose details this page should fetch
+    async def load_cards(self, pool):
+        # One retry loop: a failed goto or card wait reloads the page with a fresh deadline, and the
+        # scheduler slot is given back while backing off between attempts
+        cards = await self.retry_policy.run(
+            'navigation',
+            lambda: self.run_scheduled(self.url, lambda: self._load_cards(pool), PAGE_PRIORITY),
+            self.url,
+            classify=listing_failure,
+        )
+        cards = self.select_cards(cards)
+
+        self.seen_ids = [card['id'] for card in cards]
+
+        # Repeat listings (pinned ads, cards that shifted pages) are merged into the first record
+        if self.dedup is not None:
+            claimed = self.dedup.select(cards, *self.source)
+            self.duplicates = len(cards) - len(claimed)
+            cards = claimed
+        return cards
+
+    # Method to bring the stored relative date of a reused listing up to now
+    def refresh_relative_date(self, details):
+        published = parse_timestamp(details.get('date_published'))
+        if published:
+            details['relative_date'] = self.extractor.relative_date(published)
+        return details
+
+    # Method to load the listing page and extract its cards
+    async def _load_cards(self, pool):
+        async with pool.page(profile='index') as page:
+            # Navigation and every wait on this page share one deadline
+            deadline = self.readiness.listing_deadline()
+            page.set_default_timeout(deadline.timeout_ms())
+            try:
+                # Navigate to the page
+                with metrics.span('scraper_stage_seconds', scraper='details', stage='goto'):
+                    await self.readiness.stage(
+                        self.url, 'listing goto', deadline,
+                        lambda timeout: page.goto(self.url, wait_until="domcontentloaded", timeout=timeout),
+                    )
+                with metrics.span('scraper_stage_seconds', scraper='details', stage='wait_for_selector'):
+                    try:
+                        await self.readiness.stage(
+                            self.url, 'card wait', deadline,
+                            lambda timeout: page.wait_for_selector(CARD_SELECTOR, timeout=timeout),
+                        )
+                    except Exception as e:
+                        raise CardsNotReady(f"cards did not appear: {e}") from e
+
+                # Extract property details
+                with metrics.span('scraper_stage_seconds', scraper='details', stage='extract_cards'):
+                    return await self.scrape_cards(page)
+            finally:
+                self.readiness.finish(self.url, deadline)
+
+    # Method to run a fetch through the shared scheduler when there is one
+    async def run_scheduled(self, url, factory, priority):
+        if self.scheduler is None:
+            return await factory()
+        return await self.scheduler.submit(url, factory, priority)
+
+    # Method to drop cards outside the date window before any detail page is fetched
+    def select_cards(self, cards):
+        if self.date_window is None:
+            return cards
+
+        selected = []
+        unpinned = older = 0
+        for card in cards:
+            if card['pin'] == "Pinned today":
+                # Pinned cards can be old listings bumped to the top, so always fetch them
+                placement = 'unknown'
+            else:
+                placement = self.date_window.classify(card['tail'], card['date_published'])
+                unpinned += 1
+                older += placement == 'older'
+
+            if placement in ('inside', 'unknown'):
+                selected.append(card)
+
+        self.skipped = len(cards) - len(selected)
+        self.page_exhausted = unpinned > 0 and older == unpinned
+        return selected
+
+    # Method to scrape detail pages concurrently, returning them in the order of the links (None for failures)
+    async def fetch_details(self, links):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_once(link):
+            if self.scheduler is not None:
+                # The scheduler owns concurrency and rate limits across all categories
+                return await self.scheduler.submit(
+                    link, lambda: self._scrape_additional_details(link), DETAIL_PRIORITY
+                )
+            async with semaphore:
+                return await self._scrape_additional_details(link)
+
+        async def fetch(link):
+            # A failing card is retried on its own; finished cards are kept
+            return await self.retry_policy.run('detail', lambda: fetch_once(link), link)
+
+        results = await asyncio.gather(*(fetch(link) for link in links), return_exceptions=True)
+
+        details = []
+        for link, result in zip(links, results):
+            if isinstance(result, Exception):
+                # A failing card only loses its own details
+                print(f"Error while scraping additional details from {link}: {result}")
+                self.errors.append({'link': link, 'error': str(result)})
+                details.append(None)
+            else:
+                details.append(result)
+        return details
+
+    # Method to extract every card on the listing page in a single evaluation
+    async def scrape_cards(self, page):
+        raw_cards = await extract_cards(page)
+
+        # Listing-level dates from the page JSON let the date window judge cards without a date attribute
+        listing_index = None
+        if any(not raw['date_published'] for raw in raw_cards):
+            listing_index = await read_listing_index(page)
+
+        cards = []
+        for raw in raw_cards:
+            link = build_link(raw['href'], self.base_url)
+            date_published = raw['date_published']
+            if not date_published and listing_index is not None:
+                date_published = listing_index.date_published(raw['href'])
+            cards.append({
+                'id': await self.scrape_id(link),
+                'pin': "Pinned today" if raw['tail'] == "Pinned today" else "Not Pinned",
+                'type': raw['type'],
+                'title': raw['title'],
+                'description': raw['description'],
+                'link': link,
+                'tail': raw['tail'],
+                'date_published': date_published,
+            })
+        return cards
+
+    # Method to merge card-level data with the detail page data
+    @staticmethod
+    def build_record(card, additional_details):
+        return PropertyRecord(
+            id=card['id'],
+            date_published=additional_details.get('date_published'),
+            relative_date=additional_details.get('relative_date'),
+            pin=card['pin'],
+            type=card['type'],
+            title=card['title'],
+            description=card['description'],
+            link=card['link'],
+            image=additional_details.get('image'),
+            price=additional_details.get('price'),
+            address=additional_details.get('address'),
+            beds=additional_details.get('beds'),
+            area=additional_details.get('area'),
+            views_no=additional_details.get('views_no'),  # Added views number here
+            submitter=additional_details.get('submitter'),
+            ads=additional_details.get('ads'),
+            membership=additional_details.get('membership'),
+            phone=additional_details.get('phone'),
+        )
 
     # New method to scrape the x value (second value)
-    async def scrape_relative_date(self, page):
+    async def scrape_relative_date(self, page, deadline=None):
         try:
             # Define the parent container selector
             parent_selector = '.d-flex.styles_topData__Sx1GF'
@@ -122,15 +271,14 @@ class DetailsScraping:
             # Locate the parent container and get all the child divs with the desired class
             parent_locator = page.locator(parent_selector)
 
-            # Wait for the parent container to be visible before proceeding
-            await parent_locator.wait_for(state="visible", timeout=10000)
-
             # Get all child div elements with the class 'd-flex align-items-center styles_dataWithIcon__For9u'
             child_divs = parent_locator.locator('.d-flex.align-items-center.styles_dataWithIcon__For9u')
 
-            # Wait until the elements are available and then fetch the second child div
-            await child_divs.first.wait_for(state="visible", timeout=10000)  # Ensure first child is available
-            await child_divs.nth(1).wait_for(state="visible", timeout=10000)  # Wait for second child to be visible
+            # The second child being visible implies the container and first child are too, so one
+            # wait covers all three, bounded by what is left of the page's budget
+            timeout = deadline.timeout_ms(cap=10) if deadline else 10000
+            with metrics.span('scraper_stage_seconds', scraper='details', stage='relative_date_waits'):
+                await child_divs.nth(1).wait_for(state="visible", timeout=timeout)
 
             # Extract the x value (content of the second div)
             relative_time_locator = child_divs.nth(1).locator('div.text-5-regular.m-text-6-med.text-neutral_600')
@@ -188,6 +336,7 @@ class DetailsScraping:
 
             if views_element:
                 views_no = await views_element.inner_text()  # Get the text value of x
+                await dispose_handles(views_element)
                 return views_no.strip()  # Remove any extra whitespace
             else:
                 print(f"Views element not found using selector: {views_selector}")
@@ -209,7 +358,10 @@ class DetailsScraping:
         try:
             image_selector = '.styles_img__PC9G3'
             image = await page.query_selector(image_selector)
-            return await image.get_attribute('src') if image else None
+            try:
+                return await image.get_attribute('src') if image else None
+            finally:
+                await dispose_handles(image)
         except Exception as e:
             print(f"Error scraping image: {e}")
             return None
@@ -218,14 +370,20 @@ class DetailsScraping:
     async def scrape_price(self, page):
         price_selector = '.h3.m-h5.text-prim_4sale_500'
         price = await page.query_selector(price_selector)
-        return await price.inner_text() if price else "0 KWD"
+        try:
+            return await price.inner_text() if price else "0 KWD"
+        finally:
+            await dispose_handles(price)
 
     # New method to scrape the address
     async def scrape_address(self, page):
         address_selector = '.text-4-regular.m-text-5-med.text-neutral_600'
         address = await page.query_selector(address_selector)
         if address:
-            text = await address.inner_text()
+            try:
+                text = await address.inner_text()
+            finally:
+                await dispose_handles(address)
             # Check if the text matches the format "Ad ID: <any number>"
             if re.match(r'^Ad ID: \d+$', text):
                 return "Not Mentioned"
@@ -236,13 +394,19 @@ class DetailsScraping:
     async def scrape_beds(self, page):
         beds_selector = '.d-flex.align-items-center.bg-neutral_50.styles_attr__BN3w_ img[alt="Rooms"] + div.text-4-med.m-text-5-med.text-neutral_900'
         beds = await page.query_selector(beds_selector)
-        return await beds.inner_text() if beds else "0 Bed"
+        try:
+            return await beds.inner_text() if beds else "0 Bed"
+        finally:
+            await dispose_handles(beds)
 
     # New method to scrape the area
     async def scrape_area(self, page):
         area_selector = '.d-flex.align-items-center.bg-neutral_50.styles_attr__BN3w_ img[alt="Property Area"] + div.text-4-med.m-text-5-med.text-neutral_900'
         area = await page.query_selector(area_selector)
-        return await area.inner_text() if area else "0 m2"
+        try:
+            return await area.inner_text() if area else "0 m2"
+        finally:
+            await dispose_handles(area)
 
     # New method to scrape the phone number
     async def scrape_phone_number(self, page):
@@ -278,7 +442,12 @@ class DetailsScraping:
     async def scrape_submitter_details(self, page):
         info_wrapper_selector = '.styles_infoWrapper__v4P8_'
         info_wrappers = await page.query_selector_all(info_wrapper_selector)
+        try:
+            return await self._read_submitter_details(info_wrappers)
+        finally:
+            await dispose_handles(*info_wrappers)
 
+    async def _read_submitter_details(self, info_wrappers):
         if len(info_wrappers) > 0:
             second_div = info_wrappers[0]
             submitter_selector = '.text-4-med.m-h6.text-neutral_900'
@@ -308,6 +477,7 @@ class DetailsScraping:
                 # Fallback to the first element if no second element exists
                 membership = await detail_elements[0].inner_text()
 
+            await dispose_handles(submitter_element, *detail_elements)
             return {
                 'submitter': submitter,
                 'ads': ads,
@@ -318,50 +488,89 @@ class DetailsScraping:
     # Method to scrape additional details
     async def scrape_additional_details(self, url):
         try:
-            # Create a new page for this property detail scraping
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-
-                await page.goto(url, wait_until="domcontentloaded")
-                await page.wait_for_selector('.StackedCard_card__Kvggc', timeout=300000)
-
-                # Extract details using helper methods
-                image = await self.scrape_image(page)
-                price = await self.scrape_price(page)
-                address = await self.scrape_address(page)
-                beds = await self.scrape_beds(page)
-                area = await self.scrape_area(page)
-                views_no = await self.scrape_views_no(page)
-                submitter_details = await self.scrape_submitter_details(page)
-                phone = await self.scrape_phone_number(page)
-                relative_date = await self.scrape_relative_date(page)
-                date_published = await self.scrape_publish_date(relative_date)
-
-
-                # Consolidate details into a dictionary
-                details = {
-                    'image': image,
-                    'price': price,
-                    'address': address,
-                    'beds': beds,
-                    'area': area,
-                    'views_no': views_no,
-                    'submitter': submitter_details.get('submitter'),
-                    'ads': submitter_details.get('ads'),
-                    'membership': submitter_details.get('membership'),
-                    'phone': phone,
-                    'relative_date': relative_date,
-                    'date_published': date_published,
-                }
-
-                await browser.close()
-                return details
-
+            return await self.retry_policy.run('detail', lambda: self._scrape_additional_details(url), url)
         except Exception as e:
             print(f"Error while scraping additional details from {url}: {e}")
             return {}
 
+    # Same as scrape_additional_details, but lets errors propagate to the caller
+    async def _scrape_additional_details(self, url):
+        return await fetch_with_fallback(self.fetchers, self, url)
+
+    # Method to scrape the detail page in a browser (the 'browser' fetcher backend)
+    async def _scrape_with_browser(self, url):
+        # Borrow a pooled page for this property detail scraping
+        async with self._browser_pool() as pool:
+            async with pool.page(profile='detail') as page:
+                deadline = self.readiness.detail_deadline()
+                try:
+                    with metrics.span('scraper_stage_seconds', scraper='details', stage='detail_goto'):
+                        await self.readiness.stage(
+                            url, 'detail goto', deadline,
+                            lambda timeout: page.goto(url, wait_until="domcontentloaded", timeout=timeout),
+                        )
+                    # Extractable as soon as __NEXT_DATA__ parses with a listing (or the SSR price is there)
+                    with metrics.span('scraper_stage_seconds', scraper='details', stage='detail_readiness'):
+                        source = await self.readiness.wait_for_detail(page, url, deadline)
+                    if source is None:
+                        # Retried by the caller with a fresh budget rather than kept as an empty record
+                        raise PageValidationError(f"No extractable data on {url} within {deadline.budget}s")
+
+                    # One JSON parse resolves most fields; the DOM is only read for the gaps
+                    with metrics.span('scraper_stage_seconds', scraper='details', stage='next_data_extract'):
+                        next_data = await self.read_next_data(page) if source == 'next_data' else None
+                        details = self.extractor.extract(next_data)
+
+                    # DOM fallbacks only get what is left of the page's budget
+                    page.set_default_timeout(deadline.timeout_ms())
+                    with metrics.span('scraper_stage_seconds', scraper='details', stage='dom_fallback'):
+                        await self.fill_missing_from_dom(page, details, deadline)
+                finally:
+                    self.readiness.finish(url, deadline)
+
+        return details
+
+    # Method to read and parse script#__NEXT_DATA__ from the page
+    async def read_next_data(self, page):
+        try:
+            script_content = await page.inner_html('script#__NEXT_DATA__')
+        except Exception as e:
+            print(f"Script tag with id '__NEXT_DATA__' not found: {e}")
+            return None
+        return parse_next_data(script_content)
+
+    # Method to fall back to the DOM selectors for fields __NEXT_DATA__ did not provide
+    async def fill_missing_from_dom(self, page, details, deadline=None):
+        missing = {field for field, value in details.items() if value is None}
+        if not missing:
+            return details
+
+        dom_scrapers = {
+            'image': self.scrape_image,
+            'price': self.scrape_price,
+            'address': self.scrape_address,
+            'beds': self.scrape_beds,
+            'area': self.scrape_area,
+            'views_no': self.scrape_views_no,
+            'phone': self.scrape_phone_number,
+        }
+        for field, scraper in dom_scrapers.items():
+            if field in missing:
+                details[field] = await scraper(page)
+
+        if missing & {'submitter', 'ads', 'membership'}:
+            submitter_details = await self.scrape_submitter_details(page)
+            for field in ('submitter', 'ads', 'membership'):
+                if field in missing:
+                    details[field] = submitter_details.get(field)
+
+        if 'date_published' in missing:
+            relative_date = await self.scrape_relative_date(page, deadline)
+            details['relative_date'] = relative_date
+            details['date_published'] = await self.scrape_publish_date(relative_date)
+
+        return details
+
 
 # # Correctly run the async function with an instance of the class
 # if __name__ == "__main__":
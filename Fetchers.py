@@ -0,0 +1,207 @@
+import asyncio
+import time
+from Metrics import metrics
+from NextData import parse_next_data_html
+from ResponseCache import CacheMiss
+
+try:
+    import aiohttp
+except ImportError:  # HTTP mode is optional; the browser backend still works
+    aiohttp = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+class PageValidationError(Exception):
+    pass
+
+
+class FetcherBackend:
+    name = 'backend'
+
+    def __init__(self):
+        # Per-backend success and latency counters
+        self.stats = {'attempts': 0, 'successes': 0, 'failures': 0, 'seconds': 0.0}
+
+    def record(self, success, seconds):
+        self.stats['attempts'] += 1
+        self.stats['successes' if success else 'failures'] += 1
+        self.stats['seconds'] += seconds
+        metrics.observe('detail_fetch_seconds', seconds, backend=self.name, outcome='ok' if success else 'error')
+
+    # `last` is True when no backend follows this one, so the page has to be accepted as it is
+    async def fetch(self, scraper, url, last=False):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def report(self):
+        stats = self.stats
+        average = stats['seconds'] / stats['attempts'] if stats['attempts'] else 0.0
+        print(
+            f"Fetcher '{self.name}': {stats['successes']}/{stats['attempts']} succeeded, "
+            f"{stats['failures']} failed, {average:.3f}s average latency."
+        )
+
+
+class BrowserFetcher(FetcherBackend):
+    name = 'browser'
+
+    # Method to render the detail page in a pooled Playwright page
+    async def fetch(self, scraper, url, last=False):
+        return await scraper._scrape_with_browser(url)
+
+
+class HttpFetcher(FetcherBackend):
+    name = 'http'
+
+    # Fields that must resolve from the HTML before a page is accepted without a browser
+    REQUIRED_FIELDS = ('price', 'address', 'beds', 'area', 'date_published')
+
+    # SSR markup selectors, mirroring the DOM scrapers in DetailsScraping
+    HTML_SELECTORS = {
+        'image': ('.styles_img__PC9G3', 'src'),
+        'price': ('.h3.m-h5.text-prim_4sale_500', None),
+        'address': ('.text-4-regular.m-text-5-med.text-neutral_600', None),
+        'beds': ('.d-flex.align-items-center.bg-neutral_50.styles_attr__BN3w_ img[alt="Rooms"] + div.text-4-med.m-text-5-med.text-neutral_900', None),
+        'area': ('.d-flex.align-items-center.bg-neutral_50.styles_attr__BN3w_ img[alt="Property Area"] + div.text-4-med.m-text-5-med.text-neutral_900', None),
+        'views_no': ('.d-flex.align-items-center.styles_dataWithIcon__For9u .text-5-regular.m-text-6-med.text-neutral_600', None),
+    }
+
+    # Same defaults the DOM scrapers return when an element is absent; only used when no backend follows
+    HTML_DEFAULTS = {'price': "0 KWD", 'address': "Not Mentioned", 'beds': "0 Bed", 'area': "0 m2"}
+
+    HEADERS = {
+        'User-Agent': (
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+            '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        ),
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept-Language': 'en',
+    }
+
+    def __init__(self, max_connections=32, timeout=30, cache=None):
+        super().__init__()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cache = cache  # Optional ResponseCache consulted before the network
+        self._session = None
+        self._session_lock = asyncio.Lock()
+
+    async def _get_session(self):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed; HTTP fetch mode is unavailable.")
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                # One keep-alive connection pool for every detail page
+                connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers=self.HEADERS,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    auto_decompress=True,
+                )
+            return self._session
+
+    # Method to download the raw HTML of a page
+    async def get_html(self, url):
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached[2].decode('utf-8', errors='replace')
+            if self.cache.mode == 'replay':
+                raise CacheMiss(f"Replay cache miss for {url}")
+
+        session = await self._get_session()
+        async with session.get(url) as response:
+            response.raise_for_status()
+            body = await response.read()
+            if self.cache is not None:
+                headers = {'content-type': response.headers.get('Content-Type', 'text/html')}
+                self.cache.put(url, response.status, headers, body)
+            return body.decode(response.get_encoding() or 'utf-8', errors='replace')
+
+    # Method to fetch a detail page over HTTP and extract it without a browser
+    async def fetch(self, scraper, url, last=False):
+        html = await self.get_html(url)
+        return self.extract(scraper, html, url, last)
+
+    def extract(self, scraper, html, url, last=False):
+        next_data = parse_next_data_html(html)
+        if next_data is None:
+            raise PageValidationError(f"No __NEXT_DATA__ in {url}")
+
+        details = scraper.extractor.extract(next_data)
+        self.fill_missing_from_html(html, details)
+        if last:
+            # Nothing left to fall back to: keep the page with the DOM scrapers' placeholders
+            for field, default in self.HTML_DEFAULTS.items():
+                if details.get(field) is None:
+                    details[field] = default
+
+        missing = [field for field in self.REQUIRED_FIELDS if details.get(field) is None]
+        if missing:
+            raise PageValidationError(f"Missing {', '.join(missing)} in {url}")
+        return details
+
+    # Method to read fields __NEXT_DATA__ did not provide from the SSR markup
+    def fill_missing_from_html(self, html, details):
+        if LexborHTMLParser is None:
+            return details
+
+        missing = {field for field, value in details.items() if value is None}
+        if not missing:
+            return details
+
+        tree = LexborHTMLParser(html)
+        for field, (selector, attribute) in self.HTML_SELECTORS.items():
+            if field not in missing:
+                continue
+            node = tree.css_first(selector)
+            if node is None:
+                continue  # Left missing, so validation fails and the next backend gets the page
+            if attribute:
+                details[field] = node.attributes.get(attribute)
+            else:
+                details[field] = node.text(strip=True)
+
+        if details.get('address') and details['address'].startswith('Ad ID:'):
+            details['address'] = "Not Mentioned"
+        return details
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Method to build the backend chain for a fetch mode ('browser' or 'http')
+def build_fetchers(mode='browser', cache=None):
+    if mode == 'http':
+        return [HttpFetcher(cache=cache), BrowserFetcher()]
+    return [BrowserFetcher()]
+
+
+# Method to try each backend in order, falling back on failure
+async def fetch_with_fallback(fetchers, scraper, url):
+    if not fetchers:
+        raise ValueError(f"No fetcher backends configured for {url}")
+    last_error = None
+    for backend in fetchers:
+        start = time.perf_counter()
+        try:
+            details = await backend.fetch(scraper, url, last=backend is fetchers[-1])
+        except Exception as e:
+            backend.record(False, time.perf_counter() - start)
+            last_error = e
+            if backend is not fetchers[-1]:
+                print(f"Fetcher '{backend.name}' failed for {url}, falling back: {e}")
+            continue
+        backend.record(True, time.perf_counter() - start)
+        return details
+    raise last_error
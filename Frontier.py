@@ -0,0 +1,593 @@
+"""
+Shared work frontier for spreading one crawl across several processes or machines.
+
+    python Frontier.py work "Property for Sale" --processes 2     # on every machine; exits when drained
+    python Frontier.py status "Property for Sale"
+    python Frontier.py merge "Property for Sale"                   # writes the job's Excel file
+
+The frontier is one SQLite file on storage every worker can reach; no queue service is needed.
+Each category page is a unit, and expanding a page adds one unit per listing detail. Workers lease
+units, renew the leases while they work, and a lease that runs out (a crashed or stalled worker) goes
+back to pending for the next claim. Keep the file on a filesystem with working POSIX locks; the
+rollback journal is used instead of WAL because WAL does not work across hosts.
+
+The run a frontier was seeded for is authoritative: workers started later (even after midnight, when
+their own run key would name the next day) join it. A frontier is only started over for another run with
+`work --reseed`, or once its run is drained and merged.
+
+A worker process whose own memory outgrows SCRAPER_MEMORY_HARD_MB stops claiming, hands its units
+back and exits; `work` starts a fresh process in its place until the frontier is drained, backing off
+when workers keep exiting early and giving up after several in a row.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from CrawlScheduler import DETAIL_PRIORITY
+from DateWindow import DateWindow
+from DetailsScraper import DetailsScraping
+from Metrics import metrics
+from RetryPolicy import CircuitBreaker, RetryPolicy
+
+PAGE = 'page'
+DETAIL = 'detail'
+
+
+class Frontier:
+    def __init__(self, path, lease_seconds=120.0, max_attempts=3, busy_timeout=60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds  # A unit not renewed for this long is handed to another worker
+        self.max_attempts = max_attempts  # Leases per unit before it is given up as failed
+        self.stats = {'claimed': 0, 'requeued': 0, 'lost': 0, 'saved_fetches': 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Transactions are explicit; writers wait on each other's locks instead of failing. Workers make
+        # every call from one executor thread, so the wait never blocks their event loop
+        self.connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=DELETE")
+        with self._transaction() as cursor:
+            cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    page INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    card TEXT,
+                    result TEXT,
+                    exhausted INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    UNIQUE (kind, url)
+                )
+                """
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS units_by_state ON units (state, kind, position, page)")
+
+    # Method to run statements in one write transaction; BEGIN IMMEDIATE takes the write lock up front
+    @contextmanager
+    def _transaction(self):
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def run_key(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'run'").fetchone()
+        return json.loads(row['value']) if row else None
+
+    # Method to add every category page once; every worker calls it and only the first one seeds.
+    # The seeded run stays authoritative: a frontier holding another run is only cleared when `reseed`
+    # is set or that run is drained and merged; otherwise callers join it and should use run_key().
+    def seed(self, categories, run_key, reseed=False):
+        with self._transaction() as cursor:
+            row = cursor.execute("SELECT value FROM meta WHERE key = 'run'").fetchone()
+            if row and json.loads(row['value']) == run_key:
+                return False
+            if row and not reseed:
+                merged = cursor.execute("SELECT 1 FROM meta WHERE key = 'merged_by'").fetchone()
+                settled = cursor.execute(
+                    "SELECT COUNT(*) AS n FROM units WHERE state IN ('pending', 'leased')"
+                ).fetchone()['n'] == 0
+                if not (merged and settled):
+                    print(
+                        f"Frontier {self.path} holds the run for {json.loads(row['value'])['day']}, which is not "
+                        f"drained and merged yet; joining it (merge it, or reseed, to start a new run)."
+                    )
+                    return False
+            if row:
+                print(f"Frontier {self.path} belongs to another run; starting it over.")
+            cursor.execute("DELETE FROM units")
+            cursor.execute("DELETE FROM meta")
+            cursor.execute("INSERT INTO meta (key, value) VALUES ('run', ?)", (json.dumps(run_key),))
+            cursor.executemany(
+                "INSERT INTO units (kind, category, position, page, url) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (PAGE, name, position, page, base_url.format(page))
+                    for position, (name, base_url, pages) in enumerate(categories)
+                    for page in range(1, pages + 1)
+                ],
+            )
+        print(f"Seeded frontier {self.path} with {sum(pages for _, _, pages in categories)} pages.")
+        return True
+
+    # Method to lease the next unit to a worker, or None when nothing is pending right now.
+    # Detail units go first so pages already expanded finish before new ones are opened.
+    def claim(self, worker_id, run_key=None):
+        now = time.time()
+        with self._transaction() as cursor:
+            if run_key is not None:
+                row = cursor.execute("SELECT value FROM meta WHERE key = 'run'").fetchone()
+                if row is None or json.loads(row['value']) != run_key:
+                    return None  # Reseeded for another run; this worker has nothing left to do
+
+            # Leases nobody renewed go back to pending, or fail once they used up their attempts
+            requeued = cursor.execute(
+                """
+                UPDATE units SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                 owner = NULL, error = COALESCE(error, 'lease expired')
+                WHERE state = 'leased' AND lease_expires < ?
+                """,
+                (self.max_attempts, now),
+            ).rowcount
+            self.stats['requeued'] += requeued
+
+            row = cursor.execute(
+                """
+                SELECT * FROM units WHERE state = 'pending'
+                ORDER BY kind = 'page', position, page, id LIMIT 1
+                """
+            ).fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                """
+                UPDATE units SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id = ?
+                """,
+                (worker_id, now + self.lease_seconds, row['id']),
+            )
+        self.stats['claimed'] += 1
+        unit = dict(row)
+        unit['card'] = json.loads(unit['card']) if unit['card'] else None
+        return unit
+
+    # Method to extend the leases a worker still holds; returns how many it still owns
+    def heartbeat(self, worker_id, unit_ids):
+        if not unit_ids:
+            return 0
+        placeholders = ','.join('?' * len(unit_ids))
+        with self._transaction() as cursor:
+            return cursor.execute(
+                f"""
+                UPDATE units SET lease_expires = ?
+                WHERE owner = ? AND state = 'leased' AND id IN ({placeholders})
+                """,
+                (time.time() + self.lease_seconds, worker_id, *unit_ids),
+            ).rowcount
+
+    def _finish(self, cursor, unit, worker_id, result, exhausted=False):
+        # Only the current lease holder can finish a unit; a worker whose lease expired is ignored
+        updated = cursor.execute(
+            """
+            UPDATE units SET state = 'done', owner = NULL, result = ?, exhausted = ?, error = NULL
+            WHERE id = ? AND owner = ? AND state = 'leased'
+            """,
+            (json.dumps(result, ensure_ascii=False, default=str), int(exhausted), unit['id'], worker_id),
+        ).rowcount
+        if not updated:
+            self.stats['lost'] += 1
+        return bool(updated)
+
+    # Method to record a listing page's cards and queue their detail units in the same transaction.
+    # `stored` maps listing ids to details reused from the crawl store; those units start done.
+    def complete_page(self, unit, worker_id, cards, exhausted, stored=None):
+        stored = stored or {}
+        with self._transaction() as cursor:
+            if not self._finish(cursor, unit, worker_id, {'cards': cards}, exhausted):
+                return False
+            for card in cards:
+                details = stored.get(card['id'])
+                # A listing already queued by another page is fetched once; the merge decides which page keeps it
+                inserted = cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO units (kind, category, position, page, url, state, card, result)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        DETAIL, unit['category'], unit['position'], unit['page'], card['link'],
+                        'pending' if details is None else 'done',
+                        json.dumps(card, ensure_ascii=False),
+                        None if details is None else json.dumps(details, ensure_ascii=False, default=str),
+                    ),
+                ).rowcount
+                if not inserted:
+                    self.stats['saved_fetches'] += 1
+            if exhausted:
+                # Later pages of the category are older than the window; nobody needs to open them
+                cursor.execute(
+                    """
+                    UPDATE units SET state = 'skipped'
+                    WHERE kind = 'page' AND category = ? AND page > ? AND state = 'pending'
+                    """,
+                    (unit['category'], unit['page']),
+                )
+        return True
+
+    def complete_detail(self, unit, worker_id, details):
+        with self._transaction() as cursor:
+            return self._finish(cursor, unit, worker_id, details)
+
+    # Method to hand a failed unit back; it is retried by any worker until it runs out of attempts
+    def fail(self, unit, worker_id, error):
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                UPDATE units SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                 owner = NULL, error = ?
+                WHERE id = ? AND owner = ? AND state = 'leased'
+                """,
+                (self.max_attempts, str(error), unit['id'], worker_id),
+            )
+
+    # Method to give back leases without counting an attempt, e.g. when a worker shuts down
+    def release(self, worker_id, unit_ids):
+        if not unit_ids:
+            return
+        placeholders = ','.join('?' * len(unit_ids))
+        with self._transaction() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE units SET state = 'pending', owner = NULL, attempts = MAX(attempts - 1, 0)
+                WHERE owner = ? AND state = 'leased' AND id IN ({placeholders})
+                """,
+                (worker_id, *unit_ids),
+            )
+
+    # Method to count units by kind and state, e.g. {'page': {'done': 3, 'skipped': 5}, ...}
+    def progress(self):
+        counts = {}
+        for row in self.connection.execute("SELECT kind, state, COUNT(*) AS n FROM units GROUP BY kind, state"):
+            counts.setdefault(row['kind'], {})[row['state']] = row['n']
+        return counts
+
+    # Method to tell whether every unit is settled (done, skipped or failed)
+    def finished(self):
+        row = self.connection.execute(
+            "SELECT COUNT(*) AS n FROM units WHERE state IN ('pending', 'leased')"
+        ).fetchone()
+        return row['n'] == 0
+
+    # Method to count units that are done, skipped or failed; it only grows while workers make progress
+    def settled(self):
+        row = self.connection.execute(
+            "SELECT COUNT(*) AS n FROM units WHERE state NOT IN ('pending', 'leased')"
+        ).fetchone()
+        return row['n']
+
+    # Method to let exactly one worker write the merged output
+    def claim_merge(self, worker_id):
+        with self._transaction() as cursor:
+            return cursor.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('merged_by', ?)", (worker_id,)
+            ).rowcount == 1
+
+    # Method to return a category's page units in page order
+    def pages(self, category):
+        rows = self.connection.execute(
+            "SELECT page, state, result, exhausted, error FROM units WHERE kind = 'page' AND category = ? ORDER BY page",
+            (category,),
+        )
+        return [
+            {
+                'page': row['page'],
+                'state': row['state'],
+                'cards': json.loads(row['result'])['cards'] if row['result'] else [],
+                'exhausted': bool(row['exhausted']),
+                'error': row['error'],
+            }
+            for row in rows
+        ]
+
+    # Method to return finished details by link; failed units are absent and their cards get no details
+    def details(self):
+        rows = self.connection.execute("SELECT url, result FROM units WHERE kind = 'detail' AND state = 'done'")
+        return {row['url']: json.loads(row['result']) for row in rows}
+
+    def close(self):
+        self.connection.close()
+
+    def report(self):
+        stats = self.stats
+        progress = ', '.join(
+            f"{kind} {' '.join(f'{state}={count}' for state, count in sorted(states.items()))}"
+            for kind, states in sorted(self.progress().items())
+        )
+        print(
+            f"Frontier: {stats['claimed']} units claimed, {stats['requeued']} expired leases requeued, "
+            f"{stats['lost']} results dropped after a lost lease, {stats['saved_fetches']} duplicate listings "
+            f"not queued. {progress}"
+        )
+
+
+class FrontierWorker:
+    def __init__(self, scraper, frontier, worker_id=None, slots=None, idle_wait=5.0):
+        self.scraper = scraper  # MainScraper whose crawl resources (pool, fetchers, scheduler, store) are used
+        self.frontier = frontier
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{int(time.time())}"
+        self.slots = slots or scraper.max_pages  # Units this worker has in flight at once
+        self.idle_wait = idle_wait  # Seconds to wait for other workers' leases when nothing is pending
+        # The frontier's run, not this process's clock, decides the day
+        self.run_key = frontier.run_key() or scraper.run_key()
+        # Every worker judges cards against the run's day, even one that starts after midnight
+        run_day = datetime.strptime(self.run_key['day'], '%Y-%m-%d')
+        self.window = DateWindow.yesterday(run_day + timedelta(days=1)) if scraper.date_window else None
+        self.retry_policies = {}  # Category -> RetryPolicy with its circuit breaker
+        self.held = {}  # Unit id -> unit whose lease the heartbeat renews
+        self.stats = {'pages': 0, 'details': 0, 'failures': 0, 'replace': False}
+        self._executor = None  # One thread for every frontier call, so SQLite lock waits stay off the loop
+
+    # Method to run a blocking Frontier method on the worker's frontier thread
+    async def _call(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, *args))
+
+    def _retry_policy(self, category):
+        if category not in self.retry_policies:
+            self.retry_policies[category] = RetryPolicy(breaker=CircuitBreaker(category))
+        return self.retry_policies[category]
+
+    def _details_scraper(self, unit):
+        parsed = urlparse(unit['url'])
+        return DetailsScraping(
+            unit['url'], base_url=f"{parsed.scheme}://{parsed.netloc}", pool=self.scraper.pool,
+            fetchers=self.scraper.fetchers, date_window=self.window, scheduler=self.scraper.scheduler,
+            retry_policy=self._retry_policy(unit['category']), readiness=self.scraper.readiness,
+        )
+
+    async def run(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='frontier')
+        heartbeat = asyncio.ensure_future(self._heartbeat())
+        try:
+            await asyncio.gather(*(self._slot() for _ in range(self.slots)))
+        finally:
+            heartbeat.cancel()
+            # Units still held (the worker was interrupted) are free for others right away
+            await self._call(self.frontier.release, self.worker_id, list(self.held))
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            for category, retry_policy in self.retry_policies.items():
+                retry_policy.report(category)
+        print(
+            f"Worker {self.worker_id}: {self.stats['pages']} pages, {self.stats['details']} details, "
+            f"{self.stats['failures']} failed attempts."
+        )
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.frontier.lease_seconds / 3)
+            held = list(self.held)
+            owned = await self._call(self.frontier.heartbeat, self.worker_id, held)
+            if owned < len(held):
+                print(f"Worker {self.worker_id} lost {len(held) - owned} leases; their results will be dropped.")
+
+    # Method to tell whether the memory watchdog wants this worker process replaced
+    def _replace_requested(self):
+        watchdog = self.scraper.watchdog
+        return watchdog is not None and watchdog.restart_requested
+
+    async def _slot(self):
+        while True:
+            if self._replace_requested():
+                self.stats['replace'] = True
+                return  # Units in flight on other slots still finish; nothing new is claimed
+            unit = await self._call(self.frontier.claim, self.worker_id, self.run_key)
+            if unit is None:
+                # Other workers may still expand pages or let leases expire
+                if await self._call(self.frontier.finished) or await self._call(self.frontier.run_key) != self.run_key:
+                    return
+                await asyncio.sleep(self.idle_wait)
+                continue
+
+            self.held[unit['id']] = unit
+            try:
+                with self.scraper.memory_scope(unit['category']):
+                    if unit['kind'] == PAGE:
+                        await self.run_page(unit)
+                    else:
+                        await self.run_detail(unit)
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"Error on {unit['kind']} {unit['url']} (attempt {unit['attempts']}): {e}")
+                await self._call(self.frontier.fail, unit, self.worker_id, e)
+            finally:
+                self.held.pop(unit['id'], None)
+
+    # Method to load a listing page and queue its cards' details on the frontier
+    async def run_page(self, unit):
+        print(f"Scraping page: {unit['url']} for category: {unit['category']}")
+        scraper = self._details_scraper(unit)
+        with metrics.span('category_page_seconds', category=unit['category']):
+            cards = await scraper.load_cards(self.scraper.pool)
+
+        # Listings captured by an earlier run and unchanged since are queued as already done
+        stored = self.scraper.store.fresh_details(cards) if self.scraper.store else {}
+        stored = {listing_id: scraper.refresh_relative_date(details) for listing_id, details in stored.items()}
+        completed = await self._call(
+            self.frontier.complete_page, unit, self.worker_id, cards, scraper.page_exhausted, stored
+        )
+        if completed:
+            self.stats['pages'] += 1
+            if scraper.page_exhausted:
+                print(f"Page {unit['page']} of category {unit['category']} is older than {self.window}; "
+                      f"stopping pagination.")
+
+    # Method to fetch one listing's detail page
+    async def run_detail(self, unit):
+        scraper = self._details_scraper(unit)
+        link = unit['url']
+        details = await scraper.retry_policy.run(
+            'detail',
+            lambda: scraper.run_scheduled(link, lambda: scraper._scrape_additional_details(link), DETAIL_PRIORITY),
+            link,
+        )
+        if self.scraper.store:
+            self.scraper.store.upsert_many([(unit['card'], details)])
+        if await self._call(self.frontier.complete_detail, unit, self.worker_id, details):
+            self.stats['details'] += 1
+
+
+# Method to open the frontier of a ScraperJobs job
+def job_frontier(job, **kwargs):
+    return Frontier(job.get('frontier_path') or f"frontier/{job['name']}.sqlite3", **kwargs)
+
+
+# Method to write a drained frontier's results to the job's Excel file, like a single-process run would
+def merge_job(job):
+    from main import MainScraper
+
+    frontier = job_frontier(job)
+    try:
+        if not frontier.finished():
+            print(f"Frontier for '{job['name']}' is not drained yet: {frontier.progress()}")
+            return None
+        scraper = MainScraper(job['categories'], **job.get('options', {}))
+        scraper.collect_frontier(frontier)
+        scraper.save_to_excel(job['excel_file'])
+        # Marks the run merged (a no-op when `work --merge` already claimed it), so the next run may reseed
+        frontier.claim_merge(f"{socket.gethostname()}-{os.getpid()}")
+        return scraper
+    finally:
+        frontier.close()
+
+
+# Runs in a worker process: its own event loop, browser and frontier connection
+def work_job(job, slots=None, worker_id=None):
+    from main import MainScraper
+
+    scraper = MainScraper(job['categories'], **job.get('options', {}))
+    frontier = job_frontier(job)
+    try:
+        stats = asyncio.run(scraper.run_frontier(frontier, worker_id=worker_id, slots=slots))
+        frontier.report()
+        return stats
+    finally:
+        frontier.close()
+
+
+# Method to keep `processes` workers running on this machine until the frontier is drained, replacing
+# any that exit early (e.g. after the memory watchdog asked for a fresh process). A worker that crashes,
+# or exits before any unit was settled, counts as a failed start; replacements back off after each one,
+# and after `max_failed_starts` in a row (a crash on startup, a missing browser) the supervisor gives up.
+# Returns True once the frontier is drained, False when it gave up.
+def supervise(job, processes, slots=None, poll=2.0, reseed=False, max_failed_starts=5, max_backoff=60.0):
+    from multiprocessing import Process
+    from main import MainScraper
+
+    frontier = job_frontier(job)
+    # Seeded up front, so a drained and merged frontier left by an earlier run is not mistaken for this one
+    scraper = MainScraper(job['categories'], **job.get('options', {}))
+    frontier.seed(scraper.categories, scraper.run_key(), reseed=reseed)
+    running = []  # (process, units settled when it started)
+    started = 0
+    failed_starts = 0
+    next_start = 0.0  # Monotonic time before which no replacement is started
+    try:
+        while True:
+            settled = frontier.settled()
+            for process, settled_at_start in [entry for entry in running if not entry[0].is_alive()]:
+                running.remove((process, settled_at_start))
+                if frontier.finished():
+                    continue
+                if process.exitcode == 0 and settled > settled_at_start:
+                    failed_starts = 0  # Replaced after doing work, e.g. on the memory watchdog's request
+                    continue
+                failed_starts += 1
+                print(f"Worker for '{job['name']}' exited early with code {process.exitcode} "
+                      f"({failed_starts} in a row).")
+                if failed_starts >= max_failed_starts:
+                    print(f"Giving up on '{job['name']}' after {failed_starts} workers failed in a row; "
+                          f"the frontier keeps its progress for the next run.")
+                    for other, _ in running:
+                        other.join()
+                    return False
+                next_start = time.monotonic() + min(max_backoff, poll * 2 ** failed_starts)
+
+            drained = frontier.finished()
+            if drained and not running:
+                return True
+            if not drained and time.monotonic() >= next_start:
+                while len(running) < processes:
+                    if started >= processes:
+                        print(f"Starting a replacement worker for '{job['name']}'.")
+                    process = Process(target=work_job, args=(job, slots))
+                    process.start()
+                    running.append((process, settled))
+                    started += 1
+            time.sleep(poll)
+    finally:
+        frontier.close()
+
+
+def main():
+    from ScraperJobs import JOBS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['work', 'status', 'merge'])
+    parser.add_argument('job', help='Name of a job in ScraperJobs')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes on this machine')
+    parser.add_argument('--slots', type=int, help='Units in flight per worker process (default: max_pages)')
+    parser.add_argument('--reseed', action='store_true',
+                        help="Start a new run even if the frontier holds another run that is not merged yet")
+    parser.add_argument('--merge', action='store_true',
+                        help='After the frontier drains, write the Excel file (only one worker does)')
+    args = parser.parse_args()
+
+    jobs = {job['name']: job for job in JOBS}
+    if args.job not in jobs:
+        parser.error(f"Unknown job {args.job!r}; choose from {sorted(jobs)}")
+    job = jobs[args.job]
+
+    if args.command == 'status':
+        frontier = job_frontier(job)
+        print(json.dumps({'run': frontier.run_key(), 'progress': frontier.progress(),
+                          'finished': frontier.finished()}, indent=2))
+        frontier.close()
+        return
+    if args.command == 'merge':
+        merge_job(job)
+        return
+
+    drained = supervise(job, args.processes, args.slots, reseed=args.reseed)
+
+    if args.merge and drained:
+        frontier = job_frontier(job)
+        try:
+            merge = frontier.finished() and frontier.claim_merge(f"{socket.gethostname()}-{os.getpid()}")
+        finally:
+            frontier.close()
+        if merge:
+            merge_job(job)
+
+
+if __name__ == "__main__":
+    main()
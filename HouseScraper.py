@@ -1,114 +1,94 @@
 import asyncio
-from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
 import nest_asyncio
-import re
 from datetime import datetime
+from BrowserPool import BrowserPool
+from CardExtraction import CARD_SELECTOR, CardsNotReady, build_link, extract_cards, listing_failure, read_listing_index
+from Metrics import metrics
+from RequestFilter import RequestFilter
+from RetryPolicy import RetryPolicy
 
 # Allow nested event loops (useful in Jupyter)
 nest_asyncio.apply()
 
 
 class HouseScraping:
-    def __init__(self, url, retries=3):
+    def __init__(self, url, retries=3, pool=None, base_url='https://www.q84sale.com', retry_policy=None):
         self.url = url
         self.retries = retries  # Retry count for robustness
+        self.retry_policy = retry_policy or RetryPolicy(budgets={'navigation': retries})
+        self.pool = pool  # Shared BrowserPool; a private one is opened when None
+        self.base_url = base_url  # Site root used to build card links
+        self.error = None  # Why the page was given up on; its empty result is then not real data
 
-    async def get_property_details(self):
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+    @asynccontextmanager
+    async def _browser_pool(self):
+        if self.pool is not None:
+            yield self.pool
+            return
 
-            # Set timeouts
-            page.set_default_navigation_timeout(30000)  # 30 seconds
-            page.set_default_timeout(30000)  # General timeout
+        async with BrowserPool(request_filter=RequestFilter()) as pool:
+            yield pool
 
+    async def get_property_details(self):
+        async with self._browser_pool() as pool:
             properties = []  # To store scraped properties
 
-            for attempt in range(self.retries):
-                try:
-                    # Navigate to the page
-                    await page.goto(self.url, wait_until="domcontentloaded")
-                    await page.wait_for_selector('.StackedCard_card__Kvggc', timeout=15000)
-
-                    # Extract property details
-                    property_cards = await page.query_selector_all('.StackedCard_card__Kvggc')
-                    for card in property_cards:
-                        # Extract property information
-                        link = await self.scrape_link(card)
-                        property_type = await self.scrape_property_type(card)
-                        title = await self.scrape_title(card)
-                        description = await self.scrape_description(card)
-                        date_published = await self.scrape_date_published(page, card)
-                        relative_date = await self.scrape_relative_date(card)
-
-                        # Format the published date
-                        date_published = self.format_date(date_published)
-
-                        properties.append({
-                            'date_published': date_published,
-                            'relative_date': relative_date,
-                            'type': property_type,
-                            'title': title,
-                            'description': description,
-                            'link': link,
-                        })
-                    break  # Exit loop if successful
-
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} failed for {self.url}: {e}")
-                    if attempt + 1 == self.retries:
-                        print(f"Max retries reached for {self.url}. Returning partial results.")
-                        break
-                finally:
-                    # Close page between attempts to ensure proper cleanup
-                    await page.close()
-                    if attempt + 1 < self.retries:
-                        page = await browser.new_page()
+            try:
+                # A failed goto or card wait reloads the page; each is charged to its own budget
+                properties = await self.retry_policy.run(
+                    'navigation', lambda: self._load_page(pool), self.url, classify=listing_failure
+                )
+            except Exception as e:
+                print(f"Giving up on {self.url}: {e}")
+                self.error = str(e)
 
-            await browser.close()
             return properties
 
-    # Method to scrape the link
-    async def scrape_link(self, card):
-        rawlink = await card.get_attribute('href')
-        base_url = 'https://www.q84sale.com'
-        return f"{base_url}{rawlink}" if rawlink else None
-
-    # Method to scrape the property type
-    async def scrape_property_type(self, card):
-        selector = '.text-6-med.text-neutral_600.styles_category__NQAci'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the property title
-    async def scrape_title(self, card):
-        selector = '.text-4-med.text-neutral_900.styles_title__l5TTA'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the property description
-    async def scrape_description(self, card):
-        selector = '.text-5-regular.text-neutral_500.StackedCard_description__aXpyG'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Method to scrape the relative date
-    async def scrape_relative_date(self, card):
-        selector = '.styles_tail__82mnX p.text-6-med.text-neutral_600'
-        elements = await card.query_selector_all(selector)
-        return (await elements[0].inner_text()) if elements else None
-
-    # Method to scrape date_published
-    async def scrape_date_published(self, page, card):
-        date_selector = '[data-testid="date_published"]'
-        date_element = await card.query_selector(date_selector)
-        if date_element:
-            return await date_element.get_attribute('content')
+    # Method to load the listing page and extract its cards
+    async def _load_page(self, pool):
+        async with pool.page(profile='index') as page:
+            # Set timeouts
+            page.set_default_navigation_timeout(30000)  # 30 seconds
+            page.set_default_timeout(30000)  # General timeout
 
-        # Fallback: search page content
-        page_content = await page.content()
-        matches = re.findall(r'"date_published":"(.*?)"', page_content)
-        return matches[0] if matches else None
+            # Navigate to the page
+            with metrics.span('scraper_stage_seconds', scraper='house', stage='goto'):
+                await page.goto(self.url, wait_until="domcontentloaded")
+            with metrics.span('scraper_stage_seconds', scraper='house', stage='wait_for_selector'):
+                try:
+                    await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+                except Exception as e:
+                    raise CardsNotReady(f"cards did not appear: {e}") from e
+
+            # Extract property details
+            with metrics.span('scraper_stage_seconds', scraper='house', stage='extract_cards'):
+                return await self.scrape_cards(page)
+
+    # Method to extract every card on the page in a single evaluation
+    async def scrape_cards(self, page):
+        raw_cards = await extract_cards(page)
+
+        # Cards without their own date are looked up in the page's listing JSON, built once per page
+        listing_index = None
+        if any(not raw['date_published'] for raw in raw_cards):
+            listing_index = await read_listing_index(page)
+
+        properties = []
+        for raw in raw_cards:
+            date_published = raw['date_published']
+            if not date_published and listing_index is not None:
+                date_published = listing_index.date_published(raw['href'])
+            properties.append({
+                # Format the published date
+                'date_published': self.format_date(date_published),
+                'relative_date': raw['tail'],
+                'type': raw['type'],
+                'title': raw['title'],
+                'description': raw['description'],
+                'link': build_link(raw['href'], self.base_url),
+            })
+        return properties
 
     # Method to format date
     def format_date(self, date_string):
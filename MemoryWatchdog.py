@@ -0,0 +1,210 @@
+import asyncio
+import gc
+import os
+import time
+from contextlib import contextmanager
+from Metrics import metrics
+
+try:
+    import psutil
+except ImportError:  # Optional; /proc is read directly without it
+    psutil = None
+
+MB = 1024 * 1024
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+# Method to read a process's resident set size in bytes, or 0 when it cannot be read
+def process_rss(pid):
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+    try:
+        with open(f'/proc/{pid}/statm') as handle:
+            return int(handle.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+# Method to list every descendant of a process: Playwright's driver and the Chromium processes it starts
+def descendant_pids(pid):
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    children = {}  # Parent pid -> child pids
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as handle:
+                stat = handle.read()
+            # The command name may contain spaces; the fields after its closing parenthesis do not
+            parent = int(stat.rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    found = []
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def memory_supported():
+    return psutil is not None or os.path.exists('/proc/self/statm')
+
+
+class MemoryWatchdog:
+    def __init__(self, pool=None, soft_limit_mb=None, hard_limit_mb=None, interval=5.0, throttle_pages=None,
+                 restart_cooldown=60.0):
+        self.pool = pool  # BrowserPool to throttle, trim and restart
+        # Python plus browser RSS; above the soft limit new pages are throttled, above the hard limit
+        # Chromium is restarted (or, when Python itself is the one growing, the worker asks to be replaced)
+        self.soft_limit = (soft_limit_mb or float(os.environ.get('SCRAPER_MEMORY_SOFT_MB', 2048))) * MB
+        self.hard_limit = (hard_limit_mb or float(os.environ.get('SCRAPER_MEMORY_HARD_MB', 3072))) * MB
+        self.interval = interval  # Seconds between samples
+        self.throttle_pages = throttle_pages  # Pages kept open while throttled (default: half the pool)
+        self.restart_cooldown = restart_cooldown  # Minimum seconds between browser restarts
+        self.pid = os.getpid()
+        self.throttled = False
+        self.restart_requested = False  # Python is over the hard limit; a supervisor should replace the worker
+        self.last = {'python': 0, 'browser': 0}
+        self.peak = {'python': 0, 'browser': 0}
+        self.categories = {}  # Category -> units scoped and the RSS growth and peak share attributed to it
+        self._active = {}  # Category -> scopes currently open
+        self._last_total = None  # Python plus browser RSS at the previous sample
+        self._last_restart = 0.0
+        self._task = None
+        self.stats = {'samples': 0, 'throttles': 0, 'restarts': 0}
+
+    # Method to sample Python and browser RSS. RSS is process-wide, so the growth since the previous
+    # sample (and the current total, for the peak) is split between the categories in flight in
+    # proportion to the scopes each has open: a category with three pages loading is charged three
+    # times what a category with one is. With categories running side by side this is an estimate.
+    def sample(self):
+        python = process_rss(self.pid)
+        browser = sum(process_rss(pid) for pid in descendant_pids(self.pid))
+        total = python + browser
+        self.stats['samples'] += 1
+        self.last = {'python': python, 'browser': browser}
+        self.peak = {'python': max(self.peak['python'], python), 'browser': max(self.peak['browser'], browser)}
+
+        in_flight = sum(self._active.values())
+        growth = total - self._last_total if self._last_total is not None else 0
+        for name, scopes in self._active.items():
+            entry = self.categories[name]
+            share = scopes / in_flight
+            entry['growth'] += growth * share
+            entry['peak_share'] = max(entry['peak_share'], total * share)
+        self._last_total = total
+        return python, browser
+
+    # Method to count a unit of a category's work (a category, a page or a detail) as in flight;
+    # scopes may overlap, and samples taken meanwhile are attributed by them
+    @contextmanager
+    def category(self, name):
+        entry = self.categories.setdefault(name, {'units': 0, 'growth': 0, 'peak_share': 0})
+        entry['units'] += 1
+        self._active[name] = self._active.get(name, 0) + 1
+        try:
+            yield entry
+        finally:
+            self._active[name] -= 1
+            if not self._active[name]:
+                del self._active[name]
+
+    # Method to act on one sample: throttle, trim idle contexts, restart Chromium or ask for a new worker
+    async def check(self):
+        python, browser = self.sample()
+        total = python + browser
+
+        if total >= self.hard_limit:
+            if browser >= python and self.pool is not None:
+                if time.monotonic() - self._last_restart >= self.restart_cooldown:
+                    print(f"Memory at {total / MB:.0f} MB (browser {browser / MB:.0f} MB); restarting Chromium.")
+                    self._last_restart = time.monotonic()
+                    self.stats['restarts'] += 1
+                    metrics.inc('memory_actions_total', action='restart')
+                    await self.pool.restart()
+            elif not self.restart_requested:
+                print(f"Python is using {python / MB:.0f} MB; asking for this worker to be replaced.")
+                self.restart_requested = True
+                metrics.inc('memory_actions_total', action='replace_worker')
+
+        if total >= self.soft_limit and not self.throttled:
+            print(f"Memory at {total / MB:.0f} MB is over {self.soft_limit / MB:.0f} MB; throttling.")
+            self.throttled = True
+            self.stats['throttles'] += 1
+            metrics.inc('memory_actions_total', action='throttle')
+            if self.pool is not None:
+                self.pool.throttle(self.throttle_pages or max(1, self.pool.max_pages // 2))
+                await self.pool.close_idle()
+            gc.collect()
+        elif self.throttled and total < self.soft_limit * 0.9:
+            # A margin below the limit keeps the throttle from flapping on every sample
+            print(f"Memory back to {total / MB:.0f} MB; lifting the throttle.")
+            self.throttled = False
+            if self.pool is not None:
+                self.pool.unthrottle()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Memory watchdog check failed: {e}")
+
+    async def start(self):
+        if not memory_supported():
+            print("Memory watchdog disabled: psutil is not installed and /proc is not available.")
+            return
+        if self._task is None:
+            self.sample()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.throttled and self.pool is not None:
+            self.pool.unthrottle()
+        self.throttled = False
+
+    def snapshot(self):
+        return {
+            'python_mb': round(self.last['python'] / MB, 1),
+            'browser_mb': round(self.last['browser'] / MB, 1),
+            'peak_python_mb': round(self.peak['python'] / MB, 1),
+            'peak_browser_mb': round(self.peak['browser'] / MB, 1),
+            'throttled': self.throttled,
+            'restart_requested': self.restart_requested,
+            **self.stats,
+        }
+
+    def report(self):
+        print(
+            f"Memory: peak Python {self.peak['python'] / MB:.0f} MB, peak browser {self.peak['browser'] / MB:.0f} MB; "
+            f"{self.stats['throttles']} throttles, {self.stats['restarts']} browser restarts."
+        )
+        for name, entry in self.categories.items():
+            print(
+                f"  {name}: {entry['units']} units, {entry['growth'] / MB:+.0f} MB growth and "
+                f"{entry['peak_share'] / MB:.0f} MB at peak attributed by share of work in flight."
+            )
@@ -0,0 +1,185 @@
+import os
+import time
+
+# Upper bounds in seconds; the long tail covers the 300s waits some pages still hit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    # Method to estimate a quantile by interpolating inside the bucket that holds it
+    def quantile(self, share):
+        if not self.count:
+            return None
+        target = share * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= target and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class _Span:
+    __slots__ = ('metrics', 'key', 'start')
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        self.enabled = enabled  # When False, spans and counters cost one attribute check
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}  # (name, labels) -> value
+
+    # Time a block: `with metrics.span('scraper_stage_seconds', stage='goto'):`
+    def span(self, name, **labels):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, _key(name, labels))
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self._observe(_key(name, labels), seconds)
+
+    def _observe(self, key, seconds):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        if self.enabled:
+            key = _key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+
+    # Method to export everything as plain data, e.g. to send back from a worker process
+    def snapshot(self):
+        return {
+            'histograms': [
+                [name, list(labels), histogram.counts, histogram.sum, histogram.count]
+                for (name, labels), histogram in self.histograms.items()
+            ],
+            'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+        }
+
+    def merge(self, snapshot):
+        for name, labels, counts, total, count in snapshot['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+            histogram.sum += total
+            histogram.count += count
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # Method to render the Prometheus text exposition format
+    def prometheus(self):
+        lines = []
+        typed = set()
+
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{label_text(labels)} {value}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{label_text(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{label_text(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        return {
+            ' '.join([name] + [f"{k}={v}" for k, v in labels]): {
+                'count': histogram.count,
+                'total_seconds': round(histogram.sum, 3),
+                'p50': round(histogram.quantile(0.50), 4),
+                'p95': round(histogram.quantile(0.95), 4),
+            }
+            for (name, labels), histogram in sorted(self.histograms.items())
+        }
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        print("Run timing summary:")
+        for key, values in self.summary().items():
+            print(
+                f"  {key}: {values['count']} calls, {values['total_seconds']}s total, "
+                f"p50 {values['p50']}s, p95 {values['p95']}s"
+            )
+        for (name, labels), value in sorted(self.counters.items()):
+            print(f"  {' '.join([name] + [f'{k}={v}' for k, v in labels])}: {value}")
+
+
+# Process-wide registry; SCRAPER_METRICS=0 turns instrumentation off
+metrics = Metrics(enabled=os.environ.get('SCRAPER_METRICS', '1') != '0')
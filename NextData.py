@@ -0,0 +1,265 @@
+import json
+import re
+from datetime import datetime
+
+# Matches the Next.js bootstrap script in raw HTML
+NEXT_DATA_PATTERN = re.compile(
+    r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+
+# Output fields of a detail page, in the order DetailsScraping reports them
+DETAIL_FIELDS = [
+    'image', 'price', 'address', 'beds', 'area', 'views_no',
+    'submitter', 'ads', 'membership', 'phone', 'relative_date', 'date_published',
+]
+
+
+# Method to parse the text of script#__NEXT_DATA__
+def parse_next_data(script_content):
+    if not script_content:
+        return None
+    try:
+        return json.loads(script_content.strip())
+    except ValueError as e:
+        print(f"Error while parsing __NEXT_DATA__: {e}")
+        return None
+
+
+# Method to find and parse __NEXT_DATA__ in a full HTML document
+def parse_next_data_html(html):
+    match = NEXT_DATA_PATTERN.search(html or '')
+    return parse_next_data(match.group(1)) if match else None
+
+
+# Method to walk nested dicts/lists by a tuple of keys and indexes
+def get_path(data, path):
+    for key in path:
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and isinstance(key, int) and -len(data) <= key < len(data):
+            data = data[key]
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+# Method to turn an ISO string or epoch number into a naive local datetime
+def parse_timestamp(value):
+    if value in (None, ''):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            # Epoch values may be in milliseconds
+            seconds = value / 1000 if value > 10 ** 11 else value
+            return datetime.fromtimestamp(seconds)
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+# Keys listing objects use for their id, link and publish time in listing page JSON
+LISTING_ID_KEYS = ('id', 'listing_id', 'adId')
+LISTING_LINK_KEYS = ('slug', 'url', 'href', 'link')
+LISTING_DATE_KEYS = ('date_published', 'published_at', 'date_created', 'created_at')
+
+# Method to tell a listing object from other objects with an id and a date (a seller's
+# user: {id, created_at}, an image, ...): only listings also carry a link or slug
+def is_listing(node):
+    return (
+        any(node.get(key) not in (None, '') for key in LISTING_ID_KEYS)
+        and any(key in node for key in LISTING_DATE_KEYS)
+        and any(isinstance(node.get(key), str) and node.get(key) for key in LISTING_LINK_KEYS)
+    )
+
+
+# Listing links end in "-<listing id>", optionally followed by a slash or query string
+LISTING_ID_PATTERN = re.compile(r'-(\d+)/?(?:[?#].*)?$')
+
+
+class ListingIndex:
+    def __init__(self, listings=None):
+        self.listings = {}  # Listing id (as text) or link slug -> listing object
+
+        for listing in listings or []:
+            self.add(listing)
+
+    def add(self, listing):
+        if not is_listing(listing):
+            return
+        listing_id = next((listing[key] for key in LISTING_ID_KEYS if listing.get(key) not in (None, '')), None)
+        if listing_id is not None:
+            self.listings.setdefault(str(listing_id), listing)
+        for key in LISTING_LINK_KEYS:
+            link = listing.get(key)
+            if isinstance(link, str) and link:
+                self.listings.setdefault(link.rstrip('/').rsplit('/', 1)[-1], listing)
+
+    # Method to find the listing behind a card href or absolute link
+    def get(self, href):
+        if not href:
+            return None
+        match = LISTING_ID_PATTERN.search(href)
+        if match and match.group(1) in self.listings:
+            return self.listings[match.group(1)]
+        return self.listings.get(href.split('?')[0].rstrip('/').rsplit('/', 1)[-1])
+
+    def date_published(self, href):
+        listing = self.get(href)
+        if listing is None:
+            return None
+        value = next((listing[key] for key in LISTING_DATE_KEYS if listing.get(key) not in (None, '')), None)
+        return str(value) if value is not None else None
+
+    def __len__(self):
+        return len(self.listings)
+
+
+# Method to index every listing object in a page's __NEXT_DATA__ in one walk
+def build_listing_index(next_data):
+    index = ListingIndex()
+    stack = [next_data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if is_listing(node):
+                # Objects nested in a listing (its seller, images, ...) are not listings themselves
+                index.add(node)
+                continue
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return index
+
+
+class NextDataExtractor:
+    # Candidate paths inside props.pageProps.listing; the first non-empty value wins
+    FIELD_PATHS = {
+        'image': [('images', 0, 'url'), ('images', 0), ('image',), ('cover_image',), ('thumbnail',)],
+        'price': [('price', 'value'), ('price', 'amount'), ('price',)],
+        'address': [('address',), ('location', 'address'), ('district', 'name'), ('district_name',)],
+        'beds': [('rooms',), ('bedrooms',), ('beds',)],
+        'area': [('area',), ('property_area',), ('size',)],
+        'views_no': [('views',), ('views_count',), ('view_count',)],
+        'submitter': [('user', 'name'), ('user', 'user_name'), ('user_name',), ('submitter',)],
+        'ads': [('user', 'ads_count'), ('user', 'listings_count'), ('user_ads_count',)],
+        'membership': [('user', 'member_since'), ('user', 'created_at'), ('user', 'date_joined')],
+        'phone': [('phone',), ('user', 'phone')],
+        'date_published': [('date_published',), ('published_at',), ('date_created',), ('created_at',)],
+    }
+
+    # Attribute names as they appear in the listing attribute list (and the DOM img alt text)
+    ATTRIBUTE_NAMES = {
+        'beds': ('Rooms', 'Bedrooms'),
+        'area': ('Property Area', 'Area'),
+    }
+    ATTRIBUTE_LISTS = ('attrs_and_vals', 'attrsAndValues', 'attributes', 'attrs', 'specs')
+
+    def __init__(self, now=None):
+        self.now = now  # Fixed clock for relative_date; datetime.now() when None
+
+    # Method to locate the listing object inside the parsed __NEXT_DATA__
+    def listing(self, next_data):
+        return get_path(next_data, ('props', 'pageProps', 'listing')) or {}
+
+    # Method to map every output field from __NEXT_DATA__; unresolved fields are None
+    def extract(self, next_data):
+        listing = self.listing(next_data)
+        details = dict.fromkeys(DETAIL_FIELDS)
+        if not listing:
+            return details
+
+        raw = {field: self._first(listing, paths) for field, paths in self.FIELD_PATHS.items()}
+        for field, names in self.ATTRIBUTE_NAMES.items():
+            if raw[field] in (None, ''):
+                raw[field] = self._attribute(listing, names)
+
+        details['image'] = self._text(raw['image'])
+        details['price'] = self._price(raw['price'])
+        details['address'] = self._address(raw['address'])
+        details['beds'] = self._with_unit(raw['beds'], 'Bed')
+        details['area'] = self._with_unit(raw['area'], 'm2')
+        details['views_no'] = self._text(raw['views_no'])
+        details['submitter'] = self._text(raw['submitter'])
+        details['ads'] = self._with_unit(raw['ads'], 'ads')
+        details['membership'] = self._membership(raw['membership'])
+        details['phone'] = self._text(raw['phone'])
+
+        published = parse_timestamp(raw['date_published'])
+        if published:
+            details['date_published'] = published.strftime("%Y-%m-%d %H:%M:%S")
+            details['relative_date'] = self.relative_date(published)
+        return details
+
+    def _first(self, listing, paths):
+        for path in paths:
+            value = get_path(listing, path)
+            if value not in (None, '', [], {}):
+                return value
+        return None
+
+    def _attribute(self, listing, names):
+        for key in self.ATTRIBUTE_LISTS:
+            for item in listing.get(key) or []:
+                if not isinstance(item, dict):
+                    continue
+                name = item.get('name') or item.get('title') or item.get('label')
+                if name in names:
+                    value = item.get('value')
+                    if isinstance(value, dict):
+                        value = value.get('name') or value.get('value')
+                    return value
+        return None
+
+    def _text(self, value):
+        if value in (None, ''):
+            return None
+        if isinstance(value, dict):
+            value = value.get('url') or value.get('name')
+        return str(value).strip() if value is not None else None
+
+    def _price(self, value):
+        if isinstance(value, dict):
+            value = value.get('value', value.get('amount'))
+        if value in (None, ''):
+            return None
+        if isinstance(value, (int, float)):
+            return f"{value:,.0f} KWD"
+        text = str(value).strip()
+        return text if 'KWD' in text else f"{text} KWD"
+
+    def _address(self, value):
+        text = self._text(value)
+        # Mirror the DOM rule: an "Ad ID" line is not an address
+        if text and re.match(r'^Ad ID: \d+$', text):
+            return "Not Mentioned"
+        return text
+
+    def _with_unit(self, value, unit):
+        text = self._text(value)
+        if text is None:
+            return None
+        return text if re.search(r'[^\d.,\s]', text) else f"{text} {unit}"
+
+    def _membership(self, value):
+        if value in (None, ''):
+            return None
+        joined = parse_timestamp(value)
+        if joined:
+            return f"Member since {joined.strftime('%b %Y')}"
+        text = str(value).strip()
+        return text if text.lower().startswith('member since') else f"Member since {text}"
+
+    # Method to express a publish time the way the page shows it, without " ago"
+    def relative_date(self, published):
+        now = self.now or datetime.now()
+        seconds = max(int((now - published).total_seconds()), 0)
+        for unit, size in (('Day', 86400), ('Hour', 3600), ('Minute', 60)):
+            if seconds >= size:
+                number = seconds // size
+                return f"{number} {unit}{'s' if number != 1 else ''}"
+        return f"{seconds} Second{'s' if seconds != 1 else ''}"
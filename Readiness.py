@@ -0,0 +1,117 @@
+import time
+from collections import Counter, deque
+from Metrics import metrics
+
+# Resolves as soon as a detail page has data to extract: parsed __NEXT_DATA__ with a listing,
+# or at least the server-rendered price the DOM fallbacks read
+DETAIL_READY_JS = """
+() => {
+    const script = document.getElementById('__NEXT_DATA__');
+    if (script) {
+        try {
+            const data = JSON.parse(script.textContent);
+            if (data && data.props && data.props.pageProps && data.props.pageProps.listing) {
+                return 'next_data';
+            }
+        } catch (e) {}
+    }
+    return document.querySelector('.h3.m-h5.text-prim_4sale_500') ? 'dom' : false;
+}
+"""
+
+
+class Deadline:
+    def __init__(self, budget):
+        self.budget = budget  # Seconds for everything one page does: navigation and every wait
+        self.started = time.monotonic()
+        self.expires = self.started + budget
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    # Method to turn what is left of the budget into a Playwright timeout, optionally capped
+    def timeout_ms(self, cap=None):
+        remaining = self.remaining()
+        if cap is not None:
+            remaining = min(remaining, cap)
+        return max(1, int(remaining * 1000))
+
+
+class PageReadiness:
+    def __init__(self, listing_budget=60.0, detail_budget=45.0, slow_after=10.0, keep=50):
+        self.listing_budget = listing_budget  # Per listing page, shared by goto and the card wait
+        self.detail_budget = detail_budget  # Per detail page, shared by goto, readiness and DOM fallbacks
+        self.slow_after = slow_after  # A single stage slower than this is recorded as a slow-page reason
+        self.reasons = Counter()  # Reason -> pages
+        self.recent = deque(maxlen=keep)  # Latest (url, reason, seconds) for the report
+        self.stats = {'pages': 0, 'slow': 0, 'timeouts': 0}
+
+    def listing_deadline(self):
+        return Deadline(self.listing_budget)
+
+    def detail_deadline(self):
+        return Deadline(self.detail_budget)
+
+    def note(self, url, reason, seconds):
+        self.reasons[reason] += 1
+        self.recent.append((url, reason, round(seconds, 2)))
+        metrics.inc('slow_page_reasons_total', reason=reason)
+
+    # Method to run one stage inside the deadline, noting it when it is slow or runs out of budget
+    async def stage(self, url, name, deadline, factory):
+        start = time.monotonic()
+        try:
+            result = await factory(deadline.timeout_ms())
+        except Exception as e:
+            if 'Timeout' in type(e).__name__:
+                self.stats['timeouts'] += 1
+                self.note(url, f"{name} timed out", time.monotonic() - start)
+            raise
+        seconds = time.monotonic() - start
+        if seconds > self.slow_after:
+            self.note(url, f"{name} slow", seconds)
+        return result
+
+    # Method to wait until a detail page is extractable; returns 'next_data', 'dom' or None on timeout
+    async def wait_for_detail(self, page, url, deadline):
+        try:
+            handle = await self.stage(
+                url, 'detail readiness', deadline,
+                lambda timeout: page.wait_for_function(DETAIL_READY_JS, timeout=timeout),
+            )
+        except Exception as e:
+            if 'Timeout' not in type(e).__name__:
+                raise
+            return None
+        try:
+            source = await handle.json_value()
+        finally:
+            await handle.dispose()  # Recycled pages would otherwise keep one handle per detail page
+        if source == 'dom':
+            self.note(url, "no __NEXT_DATA__ listing, DOM fallback", deadline.elapsed())
+        return source
+
+    # Method to close out a page: count it, and note when it used up its whole budget
+    def finish(self, url, deadline):
+        self.stats['pages'] += 1
+        elapsed = deadline.elapsed()
+        metrics.observe('page_ready_seconds', elapsed)
+        if elapsed > self.slow_after:
+            self.stats['slow'] += 1
+        if deadline.expired():
+            self.note(url, "page budget exhausted", elapsed)
+
+    def report(self):
+        stats = self.stats
+        print(
+            f"Page readiness: {stats['pages']} pages, {stats['slow']} slower than {self.slow_after}s, "
+            f"{stats['timeouts']} waits ran out of budget."
+        )
+        for reason, count in self.reasons.most_common(5):
+            print(f"  {reason}: {count}")
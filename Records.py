@@ -0,0 +1,81 @@
+import pandas as pd
+
+# Output columns of a property record, in the order the sheets show them
+RECORD_FIELDS = (
+    'id', 'date_published', 'relative_date', 'pin', 'type', 'title', 'description', 'link',
+    'image', 'price', 'address', 'beds', 'area', 'views_no', 'submitter', 'ads', 'membership', 'phone',
+)
+
+# Defaults the DOM fallbacks return when a field is missing; they normalize to nulls, not zeros
+PLACEHOLDERS = ('0 KWD', '0 m2', '0 Bed', '0 ads', 'Not Mentioned', 'Invalid Relative Time',
+                'Unsupported time unit found.')
+
+NUMBER_PATTERN = r'(\d[\d,]*(?:\.\d+)?)'
+
+
+class PropertyRecord:
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, **fields):
+        for field in RECORD_FIELDS:
+            setattr(self, field, fields.get(field))
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in RECORD_FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        if field not in RECORD_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+    def __repr__(self):
+        return f"PropertyRecord(id={self.id!r}, title={self.title!r})"
+
+
+# Method to build a columnar frame straight from record slots, without an intermediate dict per record
+def records_frame(records):
+    columns = {field: [getattr(record, field) for record in records] for field in RECORD_FIELDS}
+    return pd.DataFrame(columns, columns=list(RECORD_FIELDS))
+
+
+def _numbers(series):
+    text = series.astype('string').mask(series.isin(PLACEHOLDERS))
+    digits = text.str.extract(NUMBER_PATTERN, expand=False).str.replace(',', '', regex=False)
+    return pd.to_numeric(digits, errors='coerce')
+
+
+# Method to add typed columns parsed from the display strings of a whole category at once
+def normalize_records(records):
+    frame = records if isinstance(records, pd.DataFrame) else records_frame(records)
+    frame['price_kwd'] = _numbers(frame['price']).astype('Float64')
+    frame['area_m2'] = _numbers(frame['area']).astype('Float64')
+    frame['beds_count'] = _numbers(frame['beds']).round().astype('Int64')
+    frame['ads_count'] = _numbers(frame['ads']).round().astype('Int64')
+    frame['views_count'] = _numbers(frame['views_no']).round().astype('Int64')
+
+    membership = frame['membership'].astype('string').str.replace(r'(?i)^\s*member since\s*', '', regex=True)
+    frame['member_since'] = pd.to_datetime(membership, format='%b %Y', errors='coerce')
+    frame['published_at'] = pd.to_datetime(
+        frame['date_published'].mask(frame['date_published'].isin(PLACEHOLDERS)),
+        format='%Y-%m-%d %H:%M:%S', errors='coerce',
+    )
+    return frame
+
+
+# Method to rebuild a normalized frame from plain rows, e.g. replayed from a checkpoint
+def records_from_rows(rows):
+    return normalize_records(pd.DataFrame(rows, columns=list(RECORD_FIELDS)))
+
+
+# Method to return a boolean mask of rows published on a given 'YYYY-MM-DD' day
+def published_on(frame, day):
+    return frame['published_at'].dt.normalize() == pd.Timestamp(day)
+
+
+# Method to turn a normalized frame into plain dicts for the sinks (nulls become None)
+def frame_rows(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Third-party hosts that only serve ads, analytics and tracking beacons
+TRACKING_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googlesyndication.com',
+    'doubleclick.net',
+    'googleadservices.com',
+    'facebook.net',
+    'facebook.com',
+    'connect.facebook.net',
+    'hotjar.com',
+    'clarity.ms',
+    'snapchat.com',
+    'tiktok.com',
+    'criteo.com',
+    'adnxs.com',
+)
+
+# Named profiles: resource types and domains to block, plus domains that are always allowed.
+# We only read DOM text, the image src attribute and __NEXT_DATA__, so images never need to load.
+# Listing cards are server-rendered, so index pages do not need any script at all. Stylesheets are
+# kept on both profiles: innerText follows CSS (hidden elements, text-transform) and so do visibility waits.
+PROFILES = {
+    'index': {
+        'block_types': {'image', 'media', 'font', 'script', 'texttrack', 'eventsource', 'websocket', 'manifest'},
+        'block_domains': TRACKING_DOMAINS,
+        'allow_domains': ('q84sale.com',),
+    },
+    'detail': {
+        'block_types': {'image', 'media', 'font', 'texttrack', 'eventsource', 'websocket', 'manifest'},
+        'block_domains': TRACKING_DOMAINS,
+        'allow_domains': ('q84sale.com',),
+    },
+}
+
+# Typical transfer size per blocked resource type, used to estimate bytes saved
+AVERAGE_BYTES = {
+    'image': 60000,
+    'media': 500000,
+    'font': 40000,
+    'stylesheet': 30000,
+    'script': 80000,
+    'xhr': 5000,
+    'fetch': 5000,
+    'other': 5000,
+}
+
+
+def _matches(host, domains):
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+class RequestFilter:
+    def __init__(self, profiles=None, keep_pages=500):
+        self.profiles = profiles or PROFILES
+        self.stats = {'allowed': 0, 'blocked': 0, 'bytes_saved': 0, 'pages': 0}
+        # Latest document URLs -> {'blocked': n, 'bytes_saved': n}; bounded so a long-lived pool stays flat
+        self.page_stats = OrderedDict()
+        self.keep_pages = keep_pages
+
+    # Method to decide whether a request is blocked under a profile
+    def should_block(self, profile, resource_type, url):
+        rules = self.profiles[profile]
+        if resource_type == 'document':
+            return False
+        host = urlparse(url).hostname or ''
+        if _matches(host, rules['block_domains']):
+            return True
+        if resource_type in rules['block_types']:
+            return True
+        # Scripts and data from anywhere but the site itself are not needed
+        return resource_type in ('script', 'xhr', 'fetch') and not _matches(host, rules['allow_domains'])
+
+    # Method to install the profile on a page through Playwright routing
+    async def attach(self, page, profile):
+        if profile is None:
+            return
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown request profile '{profile}'")
+
+        state = {'document': None}  # Page currently loading on this tab
+
+        async def handle(route):
+            request = route.request
+            if request.resource_type == 'document' and request.frame == page.main_frame:
+                state['document'] = request.url
+                self._track_page(request.url)
+
+            if self.should_block(profile, request.resource_type, request.url):
+                estimate = AVERAGE_BYTES.get(request.resource_type, AVERAGE_BYTES['other'])
+                self.stats['blocked'] += 1
+                self.stats['bytes_saved'] += estimate
+                page_stats = self.page_stats.get(state['document'])
+                if page_stats is not None:
+                    page_stats['blocked'] += 1
+                    page_stats['bytes_saved'] += estimate
+                await route.abort()
+                return
+
+            self.stats['allowed'] += 1
+            await route.fallback()
+
+        await page.route('**/*', handle)
+
+    def _track_page(self, url):
+        if url not in self.page_stats:
+            self.stats['pages'] += 1
+            self.page_stats[url] = {'blocked': 0, 'bytes_saved': 0}
+            while len(self.page_stats) > self.keep_pages:
+                self.page_stats.popitem(last=False)
+        else:
+            self.page_stats.move_to_end(url)
+
+    def reset(self):
+        self.stats = {'allowed': 0, 'blocked': 0, 'bytes_saved': 0, 'pages': 0}
+        self.page_stats.clear()
+
+    def report(self):
+        stats = self.stats
+        pages = stats['pages']
+        per_page = stats['blocked'] / pages if pages else 0.0
+        print(
+            f"Request filter: {stats['blocked']} blocked ({per_page:.1f} per page over {pages} pages), "
+            f"{stats['allowed']} allowed, ~{stats['bytes_saved'] / 1024 / 1024:.1f} MB saved."
+        )
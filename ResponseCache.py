@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from urllib.parse import urlparse
+
+# Listing index pages change quickly; detail pages rarely do
+DEFAULT_TTLS = {
+    'index': 15 * 60,
+    'detail': 7 * 24 * 3600,
+}
+
+MODES = ('normal', 'record', 'replay')
+
+
+class CacheMiss(Exception):
+    pass
+
+
+# Method to classify a URL as a listing index page or a detail page
+def classify_url(url):
+    path = urlparse(url).path.rstrip('/')
+    # Detail links end in "-<listing id>"; index pages end in "/<page number>"
+    return 'detail' if re.search(r'-\d+$', path) else 'index'
+
+
+class ResponseCache:
+    def __init__(self, directory='.page_cache', max_bytes=256 * 1024 * 1024, ttls=None, mode='normal',
+                 busy_timeout=30.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {MODES}")
+        self.directory = directory
+        self.max_bytes = max_bytes  # Budget for compressed bodies on disk
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.mode = mode  # 'normal', 'record' (always refetch and store) or 'replay' (cache only)
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        # Callers serialise access; the fixture server reads it from handler threads. Sharded workers
+        # share the directory, so writers wait on each other's locks instead of failing
+        self.connection = sqlite3.connect(
+            os.path.join(directory, 'index.sqlite3'), timeout=busy_timeout, check_same_thread=False
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                url_class TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.z")
+
+    # Method to return (status, headers, body) for a cached URL, or None
+    def get(self, url):
+        if self.mode == 'record':
+            return None
+
+        key = self._key(url)
+        row = self.connection.execute(
+            "SELECT url_class, status, headers, stored_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        expired = row is not None and time.time() - row[3] > self.ttls.get(row[0], 0)
+        if row is None or (expired and self.mode != 'replay'):
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            with open(self._path(key), 'rb') as handle:
+                body = zlib.decompress(handle.read())
+        except (OSError, zlib.error):
+            self._delete(key)
+            self.stats['misses'] += 1
+            return None
+
+        with self.connection:
+            self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.stats['hits'] += 1
+        self.stats['bytes_saved'] += len(body)
+        return row[1], json.loads(row[2]), body
+
+    # Method to store a response body compressed on disk
+    def put(self, url, status, headers, body):
+        if self.mode == 'replay':
+            return
+
+        key = self._key(url)
+        data = zlib.compress(body, 6)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"  # Workers storing the same page never share a temp file
+        with open(temp_path, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO entries (key, url, url_class, status, headers, size, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, url, classify_url(url), status, json.dumps(headers), len(data), now, now),
+            )
+        self.stats['stores'] += 1
+        self.evict()
+
+    # Method to drop least recently used entries until the byte budget is met
+    def evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.connection.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._delete(key)
+            total -= size
+            self.stats['evictions'] += 1
+
+    def _delete(self, key):
+        with self.connection:
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    # Method to serve a page's document requests from the cache through Playwright routing
+    async def attach(self, page):
+        async def handle(route):
+            request = route.request
+            if request.resource_type != 'document':
+                # A replayed crawl stays offline; the SSR document has everything we read
+                if self.mode == 'replay':
+                    await route.abort()
+                else:
+                    await route.fallback()
+                return
+
+            cached = self.get(request.url)
+            if cached is not None:
+                status, headers, body = cached
+                await route.fulfill(status=status, headers=headers, body=body)
+                return
+            if self.mode == 'replay':
+                print(f"Replay cache miss for {request.url}")
+                await route.abort()
+                return
+
+            response = await route.fetch()
+            body = await response.body()
+            if response.ok:
+                headers = {'content-type': response.headers.get('content-type', 'text/html')}
+                self.put(request.url, response.status, headers, body)
+            await route.fulfill(response=response, body=body)
+
+        await page.route('**/*', handle)
+
+    def close(self):
+        self.connection.close()
+
+    def report(self):
+        stats = self.stats
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / lookups if lookups else 0.0
+        print(
+            f"Response cache ({self.mode}): {stats['hits']} hits, {stats['misses']} misses "
+            f"({hit_rate:.0%} hit rate), {stats['bytes_saved']} bytes saved, "
+            f"{stats['stores']} stored, {stats['evictions']} evicted."
+        )
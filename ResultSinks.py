@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+
+# Method to turn a category name into a safe file name
+def safe_name(name):
+    return re.sub(r'[^\w\- ]+', '_', name).strip() or 'category'
+
+
+class ResultSink:
+    extension = ''
+
+    def __init__(self, directory, batch_size=100):
+        self.directory = directory
+        self.batch_size = batch_size  # Records buffered per category before an append
+        self._buffers = {}
+        self.counts = {}  # Category -> records written
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, category):
+        return os.path.join(self.directory, f"{safe_name(category)}{self.extension}")
+
+    # Method to start a category from an empty file
+    def begin(self, category):
+        self._buffers[category] = []
+        self.counts[category] = 0
+        if os.path.exists(self.path(category)):
+            os.remove(self.path(category))
+
+    # Method to push records; they are appended once a batch fills up
+    def write(self, category, records):
+        buffer = self._buffers.setdefault(category, [])
+        buffer.extend(records)
+        self.counts[category] = self.counts.get(category, 0) + len(records)
+        if len(buffer) >= self.batch_size:
+            self._flush_category(category)
+
+    def _flush_category(self, category):
+        buffer = self._buffers.get(category)
+        if buffer:
+            self._append(category, buffer)
+            self._buffers[category] = []
+
+    def flush(self):
+        for category in list(self._buffers):
+            self._flush_category(category)
+
+    def close(self):
+        self.flush()
+
+    # Method to pass every record already written through transform(record), once the sink is closed
+    def rewrite(self, transform):
+        for category, count in self.counts.items():
+            if count and os.path.exists(self.path(category)):
+                temp_path = f"{self.path(category)}.tmp"
+                self._rewrite(self.path(category), temp_path, transform)
+                os.replace(temp_path, self.path(category))
+
+    def _append(self, category, records):
+        raise NotImplementedError
+
+    def _rewrite(self, path, temp_path, transform):
+        raise NotImplementedError
+
+
+class JsonlSink(ResultSink):
+    extension = '.jsonl'
+
+    def _append(self, category, records):
+        with open(self.path(category), 'a', encoding='utf-8') as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=False, default=str))
+                handle.write('\n')
+
+    # Method to stream a category's records back one at a time
+    def read(self, category):
+        if not os.path.exists(self.path(category)):
+            return
+        with open(self.path(category), encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _rewrite(self, path, temp_path, transform):
+        with open(path, encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as target:
+            for line in source:
+                if line.strip():
+                    target.write(json.dumps(transform(json.loads(line)), ensure_ascii=False, default=str))
+                    target.write('\n')
+
+
+class CsvSink(ResultSink):
+    extension = '.csv'
+
+    def _append(self, category, records):
+        path = self.path(category)
+        new_file = not os.path.exists(path)
+        with open(path, 'a', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(records[0]), extrasaction='ignore')
+            if new_file:
+                writer.writeheader()
+            writer.writerows(records)
+
+    def _rewrite(self, path, temp_path, transform):
+        with open(path, newline='', encoding='utf-8') as source, \
+                open(temp_path, 'w', newline='', encoding='utf-8') as target:
+            reader = csv.DictReader(source)
+            writer = None
+            for record in reader:
+                # CSV has no nulls; empty cells are read back as None so transforms see what was written
+                record = transform({field: value if value != '' else None for field, value in record.items()})
+                if writer is None:
+                    fieldnames = reader.fieldnames + [field for field in record if field not in reader.fieldnames]
+                    writer = csv.DictWriter(target, fieldnames=fieldnames, extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(record)
+
+
+class ParquetSink(ResultSink):
+    extension = '.parquet'
+
+    def __init__(self, directory, batch_size=1000):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed; Parquet output is unavailable.")
+        super().__init__(directory, batch_size)
+        self._writers = {}
+
+    def begin(self, category):
+        writer = self._writers.pop(category, None)
+        if writer is not None:
+            writer.close()
+        super().begin(category)
+
+    def _append(self, category, records):
+        # Every field is written as a string column so row groups share one schema
+        writer = self._writers.get(category)
+        if writer is None:
+            schema = pa.schema([(field, pa.string()) for field in records[0]])
+            writer = pq.ParquetWriter(self.path(category), schema)
+            self._writers[category] = writer
+        columns = {
+            field: [None if record.get(field) is None else str(record.get(field)) for record in records]
+            for field in writer.schema.names
+        }
+        writer.write_table(pa.Table.from_pydict(columns, schema=writer.schema))
+
+    def close(self):
+        super().close()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def _rewrite(self, path, temp_path, transform):
+        source = pq.ParquetFile(path)
+        writer = None
+        try:
+            for batch in source.iter_batches(batch_size=self.batch_size):
+                records = [transform(record) for record in batch.to_pylist()]
+                if writer is None:
+                    names = source.schema_arrow.names
+                    names += [field for field in records[0] if field not in names]
+                    writer = pq.ParquetWriter(temp_path, pa.schema([(field, pa.string()) for field in names]))
+                columns = {
+                    field: [None if record.get(field) is None else str(record.get(field)) for record in records]
+                    for field in writer.schema.names
+                }
+                writer.write_table(pa.Table.from_pydict(columns, schema=writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+# Method to build an Excel workbook from spooled JSONL in constant memory; returns the sheets written.
+# `fields` leads the header so columns do not depend on which keys the first record happens to have.
+def write_excel_from_spool(spool, categories, file_name, transform=None, fields=()):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    written = 0
+    for name in categories:
+        records = spool.read(name)
+        if transform is not None:
+            records = map(transform, records)
+        first = next(records, None)
+        if first is None:
+            continue  # Only save sheets with data
+        sheet = workbook.create_sheet(title=name[:31])
+        header = list(fields) + [field for field in first if field not in fields]
+        sheet.append(header)
+        sheet.append([first.get(field) for field in header])
+        for record in records:
+            sheet.append([record.get(field) for field in header])
+        written += 1
+        print(f"Data for '{name}' saved to Excel.")
+
+    if written:
+        workbook.save(file_name)
+    return written
@@ -0,0 +1,95 @@
+import asyncio
+import random
+import time
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, cooldown=60):
+        self.name = name  # Category (or site) this breaker protects
+        self.failure_threshold = failure_threshold  # Consecutive failures that open the breaker
+        self.cooldown = cooldown  # Seconds to pause before letting requests through again
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.stats = {'trips': 0, 'paused_seconds': 0.0}
+
+    def is_open(self):
+        return time.monotonic() < self.open_until
+
+    def record_success(self):
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold and not self.is_open():
+            self.open_until = time.monotonic() + self.cooldown
+            self.consecutive_failures = 0
+            self.stats['trips'] += 1
+            print(f"Circuit breaker for {self.name} opened; pausing for {self.cooldown}s.")
+
+    # Method to wait out an open breaker before the next attempt
+    async def wait(self):
+        remaining = self.open_until - time.monotonic()
+        if remaining > 0:
+            self.stats['paused_seconds'] += remaining
+            await asyncio.sleep(remaining)
+
+
+class RetryPolicy:
+    # Attempts allowed per operation, counting the first try
+    DEFAULT_BUDGETS = {
+        'navigation': 3,
+        'selector': 2,
+        'detail': 3,
+    }
+
+    def __init__(self, budgets=None, base_delay=1.0, max_delay=30.0, breaker=None):
+        self.budgets = {**self.DEFAULT_BUDGETS, **(budgets or {})}
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker  # Optional CircuitBreaker shared by everything this policy retries
+        self.stats = {operation: {'attempts': 0, 'retries': 0, 'failures': 0} for operation in self.budgets}
+
+    # Method to pick an exponential backoff delay with full jitter
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    # Method to run factory() under the operation's budget, retrying only this operation. classify(error)
+    # names the operation a failure is charged to, so one retry loop can hold separate budgets for a
+    # page's navigation and its selector waits without nesting one retry inside another
+    async def run(self, operation, factory, label='', classify=None):
+        failed = {}  # Operation -> failures charged to it in this run
+
+        while True:
+            if self.breaker is not None:
+                await self.breaker.wait()
+
+            try:
+                result = await factory()
+            except Exception as e:
+                charged = classify(e) if classify is not None else operation
+                stats = self.stats.setdefault(charged, {'attempts': 0, 'retries': 0, 'failures': 0})
+                stats['attempts'] += 1
+                failed[charged] = failed.get(charged, 0) + 1
+                attempt = sum(failed.values())
+                print(f"Attempt {attempt} of {charged} failed for {label}: {e}")
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if failed[charged] >= self.budgets.get(charged, self.budgets[operation]):
+                    stats['failures'] += 1
+                    print(f"Max retries reached for {charged} of {label}.")
+                    raise
+                stats['retries'] += 1
+                await asyncio.sleep(self.backoff(attempt))
+            else:
+                self.stats.setdefault(operation, {'attempts': 0, 'retries': 0, 'failures': 0})['attempts'] += 1
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return result
+
+    def report(self, name=''):
+        parts = [
+            f"{operation} {stats['attempts']} attempts/{stats['retries']} retries/{stats['failures']} failed"
+            for operation, stats in self.stats.items() if stats['attempts']
+        ]
+        trips = self.breaker.stats['trips'] if self.breaker is not None else 0
+        print(f"Retries{f' for {name}' if name else ''}: {', '.join(parts) or 'none'}; breaker trips: {trips}.")
@@ -0,0 +1,213 @@
+"""
+Thin entry point for scheduled runs.
+
+    python ScraperClient.py            # run every job in ScraperJobs, on the warm daemon when it is up
+    python ScraperClient.py --ping     # check the daemon
+    python ScraperClient.py --local    # run in this process, starting a browser like main.py does
+
+Only the standard library is imported up front. Playwright and pandas are imported when a job has to run
+locally, and googleapiclient only when the exports are uploaded.
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+# host:port of ScraperDaemon.py
+DEFAULT_ADDRESS = os.environ.get('SCRAPER_DAEMON', '127.0.0.1:8790')
+# MainScraper options that name files or directories; the daemon runs in its own working directory
+PATH_OPTIONS = ('store_path', 'cache_dir', 'spool_dir', 'checkpoint_path')
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class DaemonError(Exception):
+    pass
+
+
+class ScraperClient:
+    def __init__(self, address=None, connect_timeout=1.0):
+        self.host, self.port = parse_address(address or DEFAULT_ADDRESS)
+        self.connect_timeout = connect_timeout  # Kept short so a missing daemon costs next to nothing
+
+    # Method to send one request and yield the daemon's replies until the job is done
+    def request(self, message):
+        try:
+            connection = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        except OSError as e:
+            raise ConnectionError(f"Scraper daemon not reachable at {self.host}:{self.port}: {e}") from e
+
+        with connection:
+            connection.settimeout(None)  # Crawls take as long as they take
+            connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+            with connection.makefile('r', encoding='utf-8') as replies:
+                for line in replies:
+                    reply = json.loads(line)
+                    if reply.get('event') == 'error':
+                        raise DaemonError(reply.get('error'))
+                    yield reply
+                    if reply.get('event') == 'done':
+                        return
+        raise ConnectionError("Scraper daemon closed the connection before the job finished.")
+
+    def available(self):
+        try:
+            return any(reply.get('event') == 'done' for reply in self.request({'op': 'ping'}))
+        except (ConnectionError, DaemonError, ValueError):
+            return False
+
+    def ping(self):
+        for reply in self.request({'op': 'ping'}):
+            if reply.get('event') == 'done':
+                return reply
+
+    # Method to run a ScraperJobs job on the daemon; the daemon writes the Excel file where this process
+    # would have, and the reply's 'excel_file' is the path written (None when there was no data)
+    def crawl(self, job):
+        submitted = time.perf_counter()
+        first_record_seconds = None
+        options = {
+            key: os.path.abspath(value) if key in PATH_OPTIONS and value else value
+            for key, value in job.get('options', {}).items()
+        }
+        job = {**job, 'excel_file': os.path.abspath(job['excel_file']), 'options': options}
+        for reply in self.request({'op': 'crawl', 'job': job}):
+            if reply.get('event') == 'records' and first_record_seconds is None:
+                first_record_seconds = time.perf_counter() - submitted
+                print(f"First records for '{job['name']}' after {first_record_seconds:.2f}s.")
+            if reply.get('event') == 'done':
+                reply['client_first_record_seconds'] = first_record_seconds
+                reply['client_seconds'] = time.perf_counter() - submitted
+                return reply
+
+    # Method to crawl listing pages with HouseScraping on the daemon, for the web app
+    async def house(self, urls):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.connect_timeout
+        )
+        try:
+            writer.write((json.dumps({'op': 'house', 'urls': urls}) + '\n').encode('utf-8'))
+            await writer.drain()
+            properties = []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Scraper daemon closed the connection before the job finished.")
+                reply = json.loads(line)
+                if reply.get('event') == 'error':
+                    raise DaemonError(reply.get('error'))
+                if reply.get('event') == 'record':
+                    properties.append(reply['record'])
+                elif reply.get('event') == 'done':
+                    return properties
+        finally:
+            writer.close()
+
+    async def available_async(self):
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+
+# Method to run a job in this process, the way main.py always has
+def run_job_locally(job):
+    from main import run_job
+    return run_job(job)
+
+
+# Method to run one job, on the daemon when there is one; returns the path of its export, or None.
+# A job the daemon fails is run again in this process, so one failure does not stop the rest.
+def run_one(client, job, local_runner):
+    start = time.perf_counter()
+    if client is not None:
+        try:
+            summary = client.crawl(job)
+        except (DaemonError, ConnectionError) as e:
+            print(f"Job '{job['name']}' failed on the daemon ({e}); running it in this process.")
+        else:
+            print(
+                f"Job '{job['name']}' finished on the daemon in {summary['client_seconds']:.1f}s "
+                f"(first record after {summary['client_first_record_seconds']}s): {summary.get('stats')}"
+            )
+            return summary.get('excel_file')
+        start = time.perf_counter()
+
+    try:
+        local_runner(job)
+    except Exception as e:
+        print(f"Job '{job['name']}' failed in this process: {e}")
+        return None
+    print(f"Job '{job['name']}' finished in this process in {time.perf_counter() - start:.1f}s.")
+    return os.path.abspath(job['excel_file']) if os.path.exists(job['excel_file']) else None
+
+
+# Method to run the scheduled jobs, uploading each export while the next job runs
+def run_jobs(jobs=None, local=False, local_runner=None):
+    from ScraperJobs import CREDENTIALS_FILE, JOBS
+
+    jobs = JOBS if jobs is None else jobs
+    local_runner = local_runner or run_job_locally
+    client = None if local else ScraperClient()
+    if client is not None and not client.available():
+        print(f"No scraper daemon at {DEFAULT_ADDRESS}; running in this process.")
+        client = None
+
+    drive_saver = None
+    uploads = []  # (job name, export file, Future of its background upload)
+    for job in jobs:
+        excel_file = run_one(client, job, local_runner)
+        if excel_file is None:
+            print(f"Job '{job['name']}' has no export to upload.")
+            continue
+
+        if drive_saver is None:
+            # Only the upload step needs the Drive client, so it is imported after the first crawl
+            from SavingOnDrive import SavingOnDrive
+            drive_saver = SavingOnDrive(CREDENTIALS_FILE)
+            drive_saver.authenticate()
+        # Each export uploads in the background while the next job is crawled
+        uploads.append((job['name'], excel_file, drive_saver.save_files_async([excel_file])))
+
+    # Wait for the uploads; reruns skip files whose content is already on Drive
+    if drive_saver is not None:
+        drive_saver.close()
+    for name, file_name, future in uploads:
+        try:
+            failed = future.result()
+        except Exception as e:
+            failed = [file_name]
+            print(f"Upload for job '{name}' failed: {e}")
+        if failed:
+            print(f"Job '{name}' export was not uploaded to Google Drive: {', '.join(failed)}")
+
+    if client is None:
+        # Where the time went, per stage, across the whole run (SCRAPER_METRICS=0 disables it)
+        from Metrics import metrics
+        metrics.print_summary()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--ping' in argv:
+        try:
+            print(json.dumps(ScraperClient().ping(), indent=2))
+        except ConnectionError as e:
+            print(e)
+            return 1
+        return 0
+    run_jobs(local='--local' in argv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Long-lived scraper process that keeps a warm Chromium and runs crawls submitted over a local socket.
+
+    python ScraperDaemon.py --address 127.0.0.1:8790 --max-pages 8
+
+Requests and replies are JSON lines. Every request gets replies until one with "event": "done"
+(or "error"):
+
+    {"op": "ping"}
+    {"op": "crawl", "job": {...}}        a ScraperJobs job; streams "records" progress, writes the Excel file
+    {"op": "house", "urls": [...]}       HouseScraping listing pages; streams one "record" per property
+    {"op": "metrics"}                    Prometheus text of the daemon's timings
+
+The warm browser is watched for memory: contexts are recycled after a number of uses or past a JS heap
+size, new pages are throttled above SCRAPER_MEMORY_SOFT_MB and Chromium is restarted above
+SCRAPER_MEMORY_HARD_MB. "ping" reports the current and peak RSS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from BrowserPool import BrowserPool
+from HouseScraper import HouseScraping
+from MemoryWatchdog import MemoryWatchdog
+from Metrics import metrics
+from RequestFilter import RequestFilter
+from ScraperClient import DEFAULT_ADDRESS, PATH_OPTIONS, parse_address
+from main import MainScraper
+
+
+class ProgressSink:
+    # Minimal sink that tells the client each time a page of records is ready
+    def __init__(self, send, job_name):
+        self.send = send
+        self.job_name = job_name
+        self.counts = {}
+
+    def begin(self, category):
+        self.counts[category] = 0
+
+    def write(self, category, records):
+        self.counts[category] = self.counts.get(category, 0) + len(records)
+        self.send({'event': 'records', 'job': self.job_name, 'category': category, 'count': len(records)})
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ScraperDaemon:
+    def __init__(self, address=None, max_pages=8, headless=True):
+        self.host, self.port = parse_address(address or DEFAULT_ADDRESS)
+        self.pool = BrowserPool(max_pages=max_pages, headless=headless, request_filter=RequestFilter())
+        self.watchdog = MemoryWatchdog(self.pool)
+        self.started_at = None
+        self.stats = {'jobs': 0, 'failures': 0, 'running': 0}
+        self.crawling = set()  # Names of the crawls running now; they own their spool and checkpoint files
+        self._server = None
+
+    async def start(self):
+        # Chromium is launched once here; every job after this skips startup entirely
+        await self.pool.start()
+        await self.watchdog.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.started_at = time.time()
+        print(f"Scraper daemon listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.watchdog.stop()
+            self.watchdog.report()
+            await self.pool.close()
+
+    async def _handle(self, reader, writer):
+        def send(message):
+            writer.write((json.dumps(message, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+            handler = getattr(self, f"op_{request.get('op')}", None)
+            if handler is None:
+                send({'event': 'error', 'error': f"Unknown op {request.get('op')!r}"})
+                return
+
+            self.stats['running'] += 1
+            try:
+                result = await handler(request, send)
+            finally:
+                self.stats['running'] -= 1
+            send({'event': 'done', **(result or {})})
+        except Exception as e:
+            self.stats['failures'] += 1
+            print(f"Daemon request failed: {e}")
+            send({'event': 'error', 'error': str(e)})
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def op_ping(self, request, send):
+        healthy = await self.pool.health_check()
+        return {
+            'healthy': healthy,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'pool': self.pool.stats,
+            'memory': self.watchdog.snapshot(),
+            **self.stats,
+        }
+
+    async def op_metrics(self, request, send):
+        return {'metrics': metrics.prometheus()}
+
+    async def op_crawl(self, request, send):
+        job = request['job']
+        options = job.get('options', {})
+        # A relative path would resolve against the daemon's working directory, not the client's
+        relative = [key for key in PATH_OPTIONS if options.get(key) and not os.path.isabs(options[key])]
+        if relative:
+            raise ValueError(f"Path options must be absolute: {', '.join(relative)}")
+        if job['name'] in self.crawling:
+            # Two runs of one job would append to the same spool and checkpoint journal
+            raise RuntimeError(f"A crawl named {job['name']!r} is already running.")
+        self.crawling.add(job['name'])
+        self.stats['jobs'] += 1
+        try:
+            scraper = MainScraper(
+                job['categories'], pool=self.pool, watchdog=self.watchdog, sinks=[ProgressSink(send, job['name'])], **options
+            )
+            await scraper.run()
+            # Clients send an absolute path; a relative one would land in the daemon's working directory,
+            # so the path actually written is what goes back (None when there was nothing to save)
+            excel_file = os.path.abspath(job['excel_file'])
+            # Excel writing is blocking work; keep the loop free for other jobs meanwhile
+            written = await asyncio.get_running_loop().run_in_executor(None, scraper.save_to_excel, excel_file)
+        finally:
+            self.crawling.discard(job['name'])
+        return {
+            'stats': scraper.stats,
+            'excel_file': excel_file if written else None,
+            'first_record_seconds': scraper.first_record_seconds,
+        }
+
+    async def op_house(self, request, send):
+        self.stats['jobs'] += 1
+        started = time.perf_counter()
+        # Pages are crawled concurrently but streamed in URL order, like the in-process crawl returns them
+        scrapers = [HouseScraping(url, pool=self.pool) for url in request['urls']]
+        tasks = [asyncio.ensure_future(scraper.get_property_details()) for scraper in scrapers]
+        first_record_seconds = None
+        count = 0
+        for task in tasks:
+            for prop in await task:
+                if first_record_seconds is None:
+                    first_record_seconds = time.perf_counter() - started
+                    metrics.observe('time_to_first_record_seconds', first_record_seconds)
+                send({'event': 'record', 'record': prop})
+                count += 1
+        failed = [f"{scraper.url}: {scraper.error}" for scraper in scrapers if scraper.error]
+        if failed:
+            # Reported as an error so the client keeps its previous results instead of a partial set
+            raise RuntimeError(f"{len(failed)} of {len(scrapers)} pages failed: {'; '.join(failed)}")
+        return {'count': count, 'first_record_seconds': first_record_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--address', default=DEFAULT_ADDRESS)
+    parser.add_argument('--max-pages', type=int, default=8)
+    parser.add_argument('--headed', action='store_true', help='Show the browser window')
+    args = parser.parse_args()
+
+    daemon = ScraperDaemon(args.address, max_pages=args.max_pages, headless=not args.headed)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Scheduled crawl jobs, shared by main.py, the thin client and the daemon.
+# Standard library only, so submitting a job to a warm daemon imports nothing heavy.
+
+# Define the scraping categories
+categories_1 = [
+    # ("House for Sale", "https://www.q84sale.com/en/property/for-sale/house-for-sale/{}", 5),
+    ("Building or floors", "https://www.q84sale.com/en/property/for-sale/building-or-floors/{}", 1),
+    ("Apartment for Sale", "https://www.q84sale.com/en/property/for-sale/apartment-for-sale/{}", 2),
+    # ("Demolishing", "https://www.q84sale.com/en/property/for-sale/demolishing/{}", 1),
+    # ("Lounge for Sale", "https://www.q84sale.com/en/property/for-sale/lounge-for-sale/{}", 1),
+    # ("Chalet for Sale", "https://www.q84sale.com/en/property/for-sale/chalet-for-sale/{}", 1),
+    # ("Farms for Sale", "https://www.q84sale.com/en/property/for-sale/farms-for-sale/{}", 1),
+    # ("Land", "https://www.q84sale.com/en/property/for-sale/land/{}", 1),
+    # ("Residential Certificate", "https://www.q84sale.com/en/property/for-sale/residential-certificate/{}", 1),
+    # ("Commercial Land Certificate", "https://www.q84sale.com/en/property/for-sale/commercial-land-certificate/{}", 1),
+    # ("Shop for Sale", "https://www.q84sale.com/en/property/for-sale/shop-for-sale/{}", 2),
+    # ("Company", "https://www.q84sale.com/en/property/for-sale/company/{}", 1),
+    # ("Wanted Property for Sale", "https://www.q84sale.com/en/property/for-sale/wanted-property-for-sale/{}", 1),
+]
+
+# categories_2 = [
+#     ("House for Rent", "https://www.q84sale.com/en/property/for-rent/house-for-rent/{}", 2),
+#     ("Floor", "https://www.q84sale.com/en/property/for-rent/floor/{}", 2),
+#     ("Furnished Apartment", "https://www.q84sale.com/en/property/for-rent/furnished-apartment/{}", 1),
+#     ("Apartment For Rent", "https://www.q84sale.com/en/property/for-rent/apartment-for-rent/{}", 7),
+#     ("Duplex", "https://www.q84sale.com/en/property/for-rent/duplex/{}", 1),
+#     ("House Sharing", "https://www.q84sale.com/en/property/for-rent/house-sharing/{}", 1),
+#     ("Shop For Rent", "https://www.q84sale.com/en/property/for-rent/shop-for-rent/{}", 1),
+#     ("Office", "https://www.q84sale.com/en/property/for-rent/office/{}", 1),
+#     ("Stores", "https://www.q84sale.com/en/property/for-rent/stores/{}", 1),
+#     ("Farms For Rent", "https://www.q84sale.com/en/property/for-rent/farms-for-rent/{}", 2),
+#     ("Lounge For Rent", "https://www.q84sale.com/en/property/for-rent/lounge-for-rent/{}", 2),
+#     ("Industrial Certificate", "https://www.q84sale.com/en/property/for-rent/industrial-certificate/{}", 1),
+#     ("Chalet For Rent", "https://www.q84sale.com/en/property/for-rent/chalet-for-rent/{}", 2),
+#     ("Rental Playgrounds", "https://www.q84sale.com/en/property/for-rent/rental-playgrounds/{}", 1),
+#     ("Wanted Property for Rent", "https://www.q84sale.com/en/property/for-rent/wanted-property-for-rent/{}", 1),
+# ]
+
+categories_3 = [
+    ("Property For Exchange", "https://www.q84sale.com/en/property/for-exchange/{}", 2),
+]
+
+# Listings already captured by an earlier run are reused instead of refetched
+STORE_PATH = "crawl_store.sqlite3"
+
+# Google Drive credentials file
+CREDENTIALS_FILE = "credentials/real-estate-property-scraper-4d9f71a7ded4.json"
+
+
+def make_job(name, categories):
+    return {
+        'name': name,
+        'categories': [list(category) for category in categories],
+        'excel_file': f"{name}.xlsx",
+        # Shared work queue when the job is spread across machines (python Frontier.py work ...)
+        'frontier_path': f"frontier/{name}.sqlite3",
+        'options': {
+            'store_path': STORE_PATH,
+            # Records are spooled to disk as each page finishes, so memory stays flat
+            'spool_dir': f"spool/{name}",
+            # An interrupted run picks up from its checkpoint journal instead of page 1
+            'checkpoint_path': f"checkpoints/{name}.jsonl",
+        },
+    }
+
+
+JOBS = [
+    make_job("Property for Sale", categories_1),
+    # make_job("Property for Rent", categories_2),
+    make_job("Property For Exchange", categories_3),
+]
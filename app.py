@@ -1,8 +1,11 @@
+import json
 import logging
 from quart import Quart, jsonify
 
-# Import your HouseScraping class (assuming it's defined in another file)
-from HouseScraper import HouseScraping
+# Import the background crawl jobs (they drive HouseScraping on a shared browser)
+from CrawlJobs import CrawlFailed, CrawlJobManager
+from Metrics import metrics
+from ScraperClient import ScraperClient
 
 # Create a Quart app
 app = Quart(__name__)
@@ -10,28 +13,80 @@ app = Quart(__name__)
 # Configure logging to display debug and error messages
 logging.basicConfig(level=logging.INFO)
 
+# Crawled on a schedule and on demand; requests are served from the latest snapshot.
+# With ScraperDaemon running, crawls go to its warm browser instead of one launched here.
+crawl_jobs = CrawlJobManager([
+    "https://www.q84sale.com/en/property/for-sale/house-for-sale/1",
+    "https://www.q84sale.com/en/property/for-sale/house-for-sale/2",
+    "https://www.q84sale.com/en/property/for-sale/house-for-sale/3",
+], client=ScraperClient())
+
+
+@app.before_serving
+async def start_crawl_jobs():
+    await crawl_jobs.start()
+
+
+@app.after_serving
+async def stop_crawl_jobs():
+    await crawl_jobs.stop()
+
+
+def snapshot_headers():
+    refreshed_at = crawl_jobs.refreshed_at
+    return {'X-Snapshot-Refreshed-At': refreshed_at.isoformat() if refreshed_at else ''}
+
+
 @app.route('/')
 async def index():
     try:
-        house_scraper_1 = HouseScraping("https://www.q84sale.com/en/property/for-sale/house-for-sale/1")
-        house_scraper_2 = HouseScraping("https://www.q84sale.com/en/property/for-sale/house-for-sale/2")
-        house_scraper_3 = HouseScraping("https://www.q84sale.com/en/property/for-sale/house-for-sale/3")
-
-        app.logger.info("Starting property scraping...")
+        all_properties = await crawl_jobs.get_snapshot()
+        return jsonify(all_properties), 200, snapshot_headers()
 
-        # Run the async functions to get property details
-        properties_1 = await house_scraper_1.get_property_details()
-        properties_2 = await house_scraper_2.get_property_details()
-        properties_3 = await house_scraper_3.get_property_details()
-
-        all_properties = properties_1 + properties_2 + properties_3
-        app.logger.info(f"Scraped {len(all_properties)} properties.")
-        return jsonify(all_properties)
+    except CrawlFailed as e:
+        # No snapshot yet and the crawl that should have made one failed
+        app.logger.error(f"No snapshot to serve: {e}")
+        return jsonify({"error": "Scraping failed", "detail": str(e)}), 503
 
     except Exception as e:
         app.logger.error(f"Error occurred: {e}", exc_info=True)
         return jsonify({"error": "Internal Server Error"}), 500
 
+
+# Stream the snapshot as newline-delimited JSON, one property per line
+@app.route('/stream')
+async def stream():
+    try:
+        all_properties = await crawl_jobs.get_snapshot()
+    except CrawlFailed as e:
+        app.logger.error(f"No snapshot to serve: {e}")
+        return jsonify({"error": "Scraping failed", "detail": str(e)}), 503
+
+    async def generate():
+        for prop in all_properties:
+            yield json.dumps(prop, ensure_ascii=False) + '\n'
+
+    headers = {'Content-Type': 'application/x-ndjson', **snapshot_headers()}
+    return generate(), 200, headers
+
+
+# Start a crawl in the background; concurrent calls share the running one
+@app.route('/refresh', methods=['POST'])
+async def refresh():
+    crawl_jobs.refresh()
+    return jsonify(crawl_jobs.status()), 202
+
+
+@app.route('/status')
+async def status():
+    return jsonify(crawl_jobs.status())
+
+
+# Per-stage timings in the Prometheus text format
+@app.route('/metrics')
+async def metrics_endpoint():
+    return metrics.prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 # Run the app
 if __name__ == "__main__":
     app.run(debug=True)
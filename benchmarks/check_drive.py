@@ -0,0 +1,110 @@
+"""
+Checks SavingOnDrive against the local Drive stand-in, without Google credentials.
+
+    python benchmarks/check_drive.py
+
+A re-exported workbook with the same rows must be skipped, changed rows must update the remote copy,
+an interrupted upload must resume from the byte Drive acknowledged, and a failed upload must be
+reported as a failure. Exits non-zero when any check fails. Needs google-api-python-client, pandas
+and openpyxl.
+"""
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_drive_server import FakeDriveServer  # noqa: E402
+
+CHUNK_SIZE = 256 * 1024
+
+
+# SavingOnDrive has no .py extension, so it is loaded from its path
+def load_saving_on_drive():
+    loader = importlib.machinery.SourceFileLoader('SavingOnDrive', os.path.join(ROOT, 'SavingOnDrive'))
+    spec = importlib.util.spec_from_loader('SavingOnDrive', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module.SavingOnDrive
+
+
+def write_workbook(file_name, rows):
+    with pd.ExcelWriter(file_name) as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name='Houses', index=False)
+
+
+def run_checks(server, directory):
+    SavingOnDrive = load_saving_on_drive()
+    failures = []
+
+    def saver():
+        drive = SavingOnDrive(None, chunk_size=CHUNK_SIZE, api_endpoint=server.url,
+                              state_file=os.path.join(directory, 'uploads.json'))
+        drive.authenticate()
+        return drive
+
+    workbook = os.path.join(directory, 'houses.xlsx')
+    rows = [{'id': '1', 'price': '100 KWD'}, {'id': '2', 'price': '200 KWD'}]
+    write_workbook(workbook, rows)
+    drive = saver()
+    if drive.save_files([workbook]) or drive.stats['uploaded'] != 1:
+        failures.append(f"first upload did not create the file: {drive.stats}")
+
+    time.sleep(1.1)  # docProps/core.xml timestamps have one-second resolution
+    write_workbook(workbook, rows)
+    drive = saver()
+    drive.save_files([workbook])
+    if drive.stats['skipped'] != 1:
+        failures.append(f"re-exported workbook with the same rows was uploaded again: {drive.stats}")
+
+    write_workbook(workbook, rows + [{'id': '3', 'price': '300 KWD'}])
+    drive = saver()
+    drive.save_files([workbook])
+    if drive.stats['updated'] != 1 or len(server.named('houses.xlsx')) != 1:
+        failures.append(f"changed workbook did not update the remote copy: {drive.stats}")
+
+    export = os.path.join(directory, 'export.bin')
+    with open(export, 'wb') as handle:
+        handle.write(os.urandom(4 * CHUNK_SIZE + 1000))
+    server.interrupt_after = 2 * CHUNK_SIZE
+    drive = saver()
+    interrupted = drive.save_files([export])
+    server.calls.clear()
+    drive = saver()
+    retried = drive.save_files([export])
+    uploaded = server.named('export.bin')
+    with open(export, 'rb') as handle:
+        content = handle.read()
+    if interrupted != [export] or retried or drive.stats['resumed'] != 1:
+        failures.append(f"interrupted upload was not resumed: {interrupted}, {retried}, {drive.stats}")
+    elif [call for call in server.calls if call[0] == 'chunk'][0][1] != 2 * CHUNK_SIZE:
+        failures.append(f"resumed upload did not continue from the acknowledged byte: {server.calls}")
+    elif len(uploaded) != 1 or uploaded[0].get('data') != content:
+        failures.append("resumed upload does not match the local file")
+
+    missing = os.path.join(directory, 'missing.xlsx')
+    drive = saver()
+    future = drive.save_files_async([missing])
+    drive.close()
+    if future.result() != [missing]:
+        failures.append("a failed upload was not reported")
+
+    return failures
+
+
+def main():
+    with FakeDriveServer() as server, tempfile.TemporaryDirectory() as directory:
+        failures = run_checks(server, directory)
+    print(json.dumps({'failures': failures}, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
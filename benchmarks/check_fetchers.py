@@ -0,0 +1,87 @@
+"""
+Checks the detail fetch chain against the local fixture server, without a browser.
+
+    python benchmarks/check_fetchers.py
+
+A complete detail page must be accepted by the HTTP backend. A page whose price is missing from both
+__NEXT_DATA__ and the markup must be rejected and handed to the next backend, and an empty backend
+chain must raise a clear error. Exits non-zero when any check fails. Needs aiohttp.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DetailsScraper import DetailsScraping  # noqa: E402
+from Fetchers import FetcherBackend, HttpFetcher, fetch_with_fallback  # noqa: E402
+from fixture_server import FixtureServer, FixtureSite  # noqa: E402
+
+CATEGORY_PATH = '/en/property/for-sale/house-for-sale'
+COMPLETE_ID = 12340101
+NO_PRICE_ID = 12340102
+
+
+class PricelessSite(FixtureSite):
+    # One listing whose price is missing from the JSON and the SSR markup alike
+    def detail_page(self, listing_id):
+        body = super().detail_page(listing_id)
+        if listing_id != NO_PRICE_ID:
+            return body
+        text = body.decode('utf-8')
+        text = re.sub(r'"price": \d+, ', '', text)
+        text = re.sub(r'<div class="h3 m-h5 text-prim_4sale_500">.*?</div>', '', text)
+        return text.encode('utf-8')
+
+
+class StandInBackend(FetcherBackend):
+    name = 'stand-in'
+
+    # Takes the place of the browser backend: records which pages were handed down the chain
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    async def fetch(self, scraper, url, last=False):
+        self.urls.append(url)
+        return {'price': 'from fallback'}
+
+
+async def run_checks(server):
+    failures = []
+    http = HttpFetcher()
+    fallback = StandInBackend()
+    fetchers = [http, fallback]
+    scraper = DetailsScraping(server.url, fetchers=fetchers)
+
+    complete_url = f"{server.url}{CATEGORY_PATH}/listing-{COMPLETE_ID}"
+    details = await fetch_with_fallback(fetchers, scraper, complete_url)
+    if complete_url in fallback.urls or not details.get('price', '').endswith('KWD'):
+        failures.append(f"complete page was not accepted over HTTP: {details}")
+
+    priceless_url = f"{server.url}{CATEGORY_PATH}/listing-{NO_PRICE_ID}"
+    details = await fetch_with_fallback(fetchers, scraper, priceless_url)
+    if priceless_url not in fallback.urls or details.get('price') != 'from fallback':
+        failures.append(f"page without a price did not fall back: {details}")
+
+    try:
+        await fetch_with_fallback([], scraper, complete_url)
+        failures.append("empty backend chain did not raise")
+    except ValueError:
+        pass
+
+    await http.close()
+    return failures
+
+
+def main():
+    with FixtureServer(site=PricelessSite()) as server:
+        failures = asyncio.run(run_checks(server))
+    print(json.dumps({'failures': failures}, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
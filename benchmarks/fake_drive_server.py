@@ -0,0 +1,202 @@
+"""
+Local stand-in for the parts of the Google Drive v3 API that SavingOnDrive uses.
+
+Supports folder lookup and creation, listing a folder (with md5Checksum and appProperties), and
+resumable uploads for new files (POST) and updates (PATCH), including the empty
+``Content-Range: bytes */<size>`` status query. An upload can be interrupted once after a given
+number of bytes to exercise resuming. Point SavingOnDrive at it with ``api_endpoint=server.url``
+and no credentials file.
+
+    python benchmarks/fake_drive_server.py --port 8766
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class FakeDriveServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.files = {}  # File id -> {'id', 'name', 'parents', 'mimeType', 'md5Checksum', 'appProperties', 'data'}
+        self.sessions = {}  # Upload session id -> {'meta', 'file_id', 'data', 'done'}
+        self.calls = []  # (operation, detail) in arrival order
+        self.interrupt_after = None  # Bytes after which the next chunk is refused once
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def named(self, name):
+        return [entry for entry in self.files.values() if entry['name'] == name]
+
+    def _list(self, query):
+        parent = re.search(r"'([^']+)' in parents", query)
+        name = re.search(r"name = '((?:[^'\\]|\\.)*)'", query)
+        found = []
+        for entry in self.files.values():
+            if parent and parent.group(1) not in entry['parents']:
+                continue
+            if name and entry['name'] != name.group(1):
+                continue
+            if FOLDER_MIME_TYPE in query and entry.get('mimeType') != FOLDER_MIME_TYPE:
+                continue
+            found.append({key: entry[key] for key in ('id', 'name', 'md5Checksum', 'appProperties') if key in entry})
+        return found
+
+    def _new_file(self, meta):
+        file_id = f"file{next(self._ids)}"
+        self.files[file_id] = {
+            'id': file_id,
+            'name': meta['name'],
+            'parents': meta.get('parents', []),
+            **{key: meta[key] for key in ('mimeType', 'appProperties') if key in meta},
+        }
+        return self.files[file_id]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _body(self):
+                return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            def _json(self, value, status=200):
+                body = json.dumps(value).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _empty(self, status, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def _open_session(self, meta, file_id=None):
+                session_id = str(next(server._ids))
+                server.sessions[session_id] = {'meta': meta, 'file_id': file_id, 'data': b'', 'done': None}
+                self._empty(200, {'Location': f"http://{self.headers['Host']}/upload/session/{session_id}"})
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+                with server._lock:
+                    server.calls.append(('list', query))
+                    self._json({'files': server._list(query)})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                meta = json.loads(self._body() or b'{}')
+                with server._lock:
+                    if 'uploadType=resumable' in url.query:
+                        server.calls.append(('start', meta.get('name')))
+                        self._open_session(meta)
+                        return
+                    server.calls.append(('create', meta.get('name')))
+                    self._json({'id': server._new_file(meta)['id']})
+
+            def do_PATCH(self):
+                url = urlparse(self.path)
+                file_id = url.path.rstrip('/').rsplit('/', 1)[-1]
+                meta = json.loads(self._body() or b'{}')
+                with server._lock:
+                    server.calls.append(('update', file_id))
+                    self._open_session(meta, file_id)
+
+            def do_PUT(self):
+                session_id = urlparse(self.path).path.rstrip('/').rsplit('/', 1)[-1]
+                data = self._body()
+                with server._lock:
+                    session = server.sessions.get(session_id)
+                    if session is None:
+                        self._empty(404)
+                        return
+                    if session['done'] is not None:
+                        self._json({'id': session['done']})
+                        return
+
+                    match = CONTENT_RANGE.match(self.headers.get('Content-Range', ''))
+                    if match is None:
+                        # Status query: report what has been received so far
+                        server.calls.append(('status', len(session['data'])))
+                    else:
+                        start, total = int(match.group(1)), match.group(3)
+                        if server.interrupt_after is not None and len(session['data']) >= server.interrupt_after:
+                            server.interrupt_after = None
+                            server.calls.append(('interrupted', len(session['data'])))
+                            self._json({'error': {'code': 403, 'message': 'Injected interruption'}}, status=403)
+                            return
+                        server.calls.append(('chunk', start))
+                        session['data'] = session['data'][:start] + data
+                        if total != '*' and len(session['data']) == int(total):
+                            self._complete(session)
+                            return
+
+                    received = len(session['data'])
+                    self._empty(308, {'Range': f"bytes=0-{received - 1}"} if received else None)
+
+            def _complete(self, session):
+                if session['file_id']:
+                    entry = server.files[session['file_id']]
+                    entry.update({key: session['meta'][key] for key in ('appProperties',) if key in session['meta']})
+                else:
+                    entry = server._new_file(session['meta'])
+                entry['data'] = session['data']
+                entry['md5Checksum'] = hashlib.md5(session['data']).hexdigest()
+                session['done'] = entry['id']
+                self._json({'id': entry['id']})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    server = FakeDriveServer(args.host, args.port)
+    print(f"Serving a Drive stand-in on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Local stand-in for q84sale used by the benchmarks.
+
+Listing pages (``/en/property/<category>/<page>``) carry ``StackedCard_card__Kvggc`` cards and
+detail pages (``/en/property/<category>/<slug>-<id>``) carry ``__NEXT_DATA__`` plus the SSR markup
+the DOM fallbacks read. Pages are generated deterministically, or served from a ResponseCache
+directory recorded with ``cache_mode='record'``. Latency and errors can be injected.
+
+    python benchmarks/fixture_server.py --port 8765 --latency-ms 50 --error-rate 0.02
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ResponseCache import ResponseCache  # noqa: E402
+
+LISTING_PATH = re.compile(r'^(?P<category>/en/property/.+)/(?P<page>\d+)/?$')
+DETAIL_PATH = re.compile(r'^(?P<category>/en/property/.+)/(?P<slug>[^/]+)-(?P<id>\d+)/?$')
+
+
+def relative_text(published, now):
+    seconds = int((now - published).total_seconds())
+    for unit, size in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= size:
+            number = seconds // size
+            return f"{number} {unit}{'s' if number != 1 else ''} ago"
+    return "Just now"
+
+
+class FixtureSite:
+    def __init__(self, cards_per_page=20, pinned_per_page=2, hours_per_page=12, recordings=None,
+                 recorded_host='https://www.q84sale.com'):
+        self.cards_per_page = cards_per_page
+        self.pinned_per_page = pinned_per_page  # Old listings bumped to the top of every page
+        self.hours_per_page = hours_per_page  # How far back in time each listing page reaches
+        self.recordings = ResponseCache(recordings, mode='replay') if recordings else None
+        self.recorded_host = recorded_host  # Host the recorded URLs were fetched from
+        self.now = datetime.now().replace(microsecond=0)
+        self._lock = threading.Lock()
+
+    # Ids encode the page and card position so a detail page can be rendered consistently
+    def _listing_id(self, category, page, index):
+        return (zlib.crc32(category.encode('utf-8')) % 9000 + 1000) * 10000 + (page % 100) * 100 + index
+
+    def _published(self, page, index):
+        if index < self.pinned_per_page:
+            return self.now - timedelta(days=30)
+        # Pages walk back in time, so date-window crawls stop paginating like on the real site
+        step = timedelta(hours=self.hours_per_page) / max(self.cards_per_page, 1)
+        return self.now - timedelta(hours=self.hours_per_page * (page - 1)) - step * index
+
+    def recorded(self, path):
+        if self.recordings is None:
+            return None
+        with self._lock:
+            cached = self.recordings.get(f"{self.recorded_host}{path}")
+        return cached[2] if cached else None
+
+    def listing_page(self, category, page):
+        cards = []
+        listings = []
+        for index in range(self.cards_per_page):
+            listing_id = self._listing_id(category, page, index)
+            pinned = index < self.pinned_per_page
+            published = self._published(page, index)
+            href = f"{category}/listing-{listing_id}"
+            tail = "Pinned today" if pinned else relative_text(published, self.now)
+            listings.append({'id': listing_id, 'slug': f"listing-{listing_id}", 'date_published': published.isoformat()})
+            cards.append(f"""
+<a class="StackedCard_card__Kvggc" href="{href}">
+  <div class="text-6-med text-neutral_600 styles_category__NQAci">Fixture category</div>
+  <div class="text-4-med text-neutral_900 styles_title__l5TTA">Listing {listing_id}</div>
+  <div class="text-5-regular text-neutral_500 StackedCard_description__aXpyG">Description of listing {listing_id}</div>
+  <div class="styles_tail__82mnX"><p class="text-6-med text-neutral_600">{html.escape(tail)}</p></div>
+</a>""")
+        next_data = {'props': {'pageProps': {'listings': listings}}}
+        return self._document(''.join(cards), next_data)
+
+    def detail_page(self, listing_id):
+        rng = random.Random(listing_id)
+        published = self._published((listing_id // 100) % 100, listing_id % 100)
+        listing = {
+            'id': listing_id,
+            'price': rng.randrange(50, 2000) * 1000,
+            'address': f"Block {rng.randrange(1, 12)}, Fixture District",
+            'phone': f"9{rng.randrange(1000000, 9999999)}",
+            'views': rng.randrange(10, 5000),
+            'date_published': published.isoformat(),
+            'images': [{'url': f"/images/{listing_id}.jpg"}],
+            'user': {'name': f"Submitter {listing_id % 50}", 'ads_count': rng.randrange(1, 40),
+                     'member_since': '2020-01-01'},
+            'attrs_and_vals': [
+                {'name': 'Rooms', 'value': str(rng.randrange(1, 8))},
+                {'name': 'Property Area', 'value': str(rng.randrange(100, 1000))},
+            ],
+        }
+        body = f"""
+<img class="styles_img__PC9G3" src="/images/{listing_id}.jpg">
+<div class="h3 m-h5 text-prim_4sale_500">{listing['price']:,} KWD</div>
+<div class="text-4-regular m-text-5-med text-neutral_600">{html.escape(listing['address'])}</div>
+<div class="d-flex styles_topData__Sx1GF">
+  <div class="d-flex align-items-center styles_dataWithIcon__For9u"><div class="text-5-regular m-text-6-med text-neutral_600">{listing['views']}</div></div>
+  <div class="d-flex align-items-center styles_dataWithIcon__For9u"><div class="text-5-regular m-text-6-med text-neutral_600">{relative_text(published, self.now)}</div></div>
+</div>"""
+        return self._document(body, {'props': {'pageProps': {'listing': listing}}})
+
+    def _document(self, body, next_data):
+        return (
+            "<!DOCTYPE html><html><head><title>fixture</title></head><body>"
+            f"{body}"
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script>'
+            "</body></html>"
+        ).encode('utf-8')
+
+    # Method to return the body for a path, or None for a 404
+    def render(self, path):
+        recorded = self.recorded(path)
+        if recorded is not None:
+            return recorded
+        match = DETAIL_PATH.match(path)
+        if match:
+            return self.detail_page(int(match.group('id')))
+        match = LISTING_PATH.match(path)
+        if match:
+            return self.listing_page(match.group('category'), int(match.group('page')))
+        return None
+
+
+class FixtureServer:
+    def __init__(self, site=None, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=0):
+        self.site = site or FixtureSite()
+        self.latency_ms = latency_ms  # Added to every response
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate  # Share of requests answered with a 503
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.stats['requests'] += 1
+                    delay = server.latency_ms + server._random.uniform(0, server.jitter_ms)
+                    fail = server._random.random() < server.error_rate
+                if delay:
+                    time.sleep(delay / 1000)
+
+                if fail:
+                    with server._lock:
+                        server.stats['errors'] += 1
+                    self.send_error(503, 'Injected error')
+                    return
+
+                body = server.site.render(self.path.split('?')[0])
+                if body is None:
+                    with server._lock:
+                        server.stats['not_found'] += 1
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--cards', type=int, default=20)
+    parser.add_argument('--recordings', help='ResponseCache directory recorded from the live site')
+    args = parser.parse_args()
+
+    site = FixtureSite(cards_per_page=args.cards, recordings=args.recordings)
+    server = FixtureServer(site, args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Serving fixtures on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
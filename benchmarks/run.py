@@ -0,0 +1,206 @@
+"""
+Offline end-to-end benchmarks against the local fixture server.
+
+    python benchmarks/run.py --scenario all --pages 3 --latency-ms 20 --error-rate 0.01 --output bench.json
+
+Every scenario reports listings/sec, p50/p95/p99 latency per stage, browser launches and peak RSS
+as JSON so runs can be compared against each other.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BrowserPool import BrowserPool  # noqa: E402
+from DetailsScraper import DetailsScraping  # noqa: E402
+from Fetchers import build_fetchers  # noqa: E402
+from HouseScraper import HouseScraping  # noqa: E402
+from MemoryWatchdog import descendant_pids, process_rss  # noqa: E402
+from Metrics import metrics  # noqa: E402
+from RequestFilter import RequestFilter  # noqa: E402
+from fixture_server import FixtureServer, FixtureSite  # noqa: E402
+from main import MainScraper  # noqa: E402
+
+CATEGORY_PATH = '/en/property/for-sale/house-for-sale/{}'
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = {}  # Stage -> durations in seconds
+
+    # Wrap an async method on a class for the duration of a scenario
+    @contextmanager
+    def stage(self, cls, method_name, stage):
+        original = getattr(cls, method_name)
+        timer = self
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                timer.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+        setattr(cls, method_name, timed)
+        try:
+            yield
+        finally:
+            setattr(cls, method_name, original)
+
+    def summary(self):
+        return {
+            stage: {
+                'count': len(values),
+                'p50': round(percentile(values, 0.50), 4),
+                'p95': round(percentile(values, 0.95), 4),
+                'p99': round(percentile(values, 0.99), 4),
+            }
+            for stage, values in self.samples.items()
+        }
+
+
+async def scenario_house(server, args, timer):
+    listings = 0
+    with timer.stage(HouseScraping, '_load_page', 'listing_page'):
+        async with BrowserPool(request_filter=RequestFilter()) as pool:
+            for page in range(1, args.pages + 1):
+                url = f"{server.url}{CATEGORY_PATH.format(page)}"
+                properties = await HouseScraping(url, pool=pool, base_url=server.url).get_property_details()
+                listings += len(properties)
+    return listings
+
+
+async def scenario_details(server, args, timer):
+    listings = 0
+    fetchers = build_fetchers(args.fetch_mode)
+    with timer.stage(DetailsScraping, '_load_cards', 'listing_page'), \
+            timer.stage(DetailsScraping, '_scrape_additional_details', 'detail'):
+        async with BrowserPool(request_filter=RequestFilter()) as pool:
+            try:
+                for page in range(1, args.pages + 1):
+                    url = f"{server.url}{CATEGORY_PATH.format(page)}"
+                    scraper = DetailsScraping(url, pool=pool, base_url=server.url, fetchers=fetchers)
+                    listings += len(await scraper.get_property_details())
+            finally:
+                for backend in fetchers:
+                    await backend.close()
+    return listings
+
+
+async def scenario_main(server, args, timer):
+    categories = [
+        (f"Fixture {index}", f"{server.url}/en/property/for-sale/fixture-{index}/{{}}", args.pages)
+        for index in range(1, args.categories + 1)
+    ]
+    scraper = MainScraper(categories, fetch_mode=args.fetch_mode)
+    with timer.stage(MainScraper, 'scrape_category', 'category'), \
+            timer.stage(DetailsScraping, '_load_cards', 'listing_page'), \
+            timer.stage(DetailsScraping, '_scrape_additional_details', 'detail'):
+        await scraper.run()
+    return scraper.stats['listings']
+
+
+SCENARIOS = {
+    'house': scenario_house,
+    'details': scenario_details,
+    'main': scenario_main,
+}
+
+
+class BrowserRssSampler:
+    # Samples the combined RSS of this process's live descendants (the Playwright driver and Chromium)
+    # in a thread; RUSAGE_CHILDREN would only cover children already reaped, and only the largest one
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        pid = os.getpid()
+        while not self._stop.is_set():
+            self.peak = max(self.peak, sum(process_rss(child) for child in descendant_pids(pid)))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_scenario(name, server, args):
+    timer = StageTimer()
+    metrics.reset()
+    launches_before = BrowserPool.launch_count
+    requests_before = server.stats['requests']
+    start = time.perf_counter()
+    with BrowserRssSampler() as browser_rss:
+        listings = asyncio.run(SCENARIOS[name](server, args, timer))
+    elapsed = time.perf_counter() - start
+    return {
+        'scenario': name,
+        'seconds': round(elapsed, 3),
+        'listings': listings,
+        'listings_per_sec': round(listings / elapsed, 3) if elapsed else 0.0,
+        'stages': timer.summary(),
+        # Finer-grained spans from the scrapers themselves (goto, selector waits, extraction, ...)
+        'instrumented_stages': metrics.summary(),
+        'browser_launches': BrowserPool.launch_count - launches_before,
+        'server_requests': server.stats['requests'] - requests_before,
+        # Process-wide peak, so later scenarios include earlier ones
+        'python_peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        # Sampled during this scenario only: the driver and every Chromium process together
+        'browser_peak_rss_kb': browser_rss.peak // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', default='all', choices=['all', *SCENARIOS])
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--categories', type=int, default=2, help='Categories in the main scenario')
+    parser.add_argument('--cards', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fetch-mode', default='browser', choices=['browser', 'http'])
+    parser.add_argument('--recordings', help='ResponseCache directory recorded from the live site')
+    parser.add_argument('--output', help='Write the JSON report to this file as well')
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+    site = FixtureSite(cards_per_page=args.cards, recordings=args.recordings)
+    with FixtureServer(site, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate) as server:
+        results = [run_scenario(name, server, args) for name in names]
+
+    report = json.dumps({
+        'settings': vars(args),
+        'results': results,
+    }, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(report)
+
+
+if __name__ == "__main__":
+    main()
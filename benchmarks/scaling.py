@@ -0,0 +1,122 @@
+"""
+Throughput of MainScraper.run_sharded (or workers sharing a Frontier) versus worker process count.
+
+    python benchmarks/scaling.py --workers 1 2 4 --category "House for Sale|https://www.q84sale.com/en/property/for-sale/house-for-sale/{}|5"
+    python benchmarks/scaling.py --workers 1 2 4 --fixture --latency-ms 50
+    python benchmarks/scaling.py --workers 1 2 4 --fixture --latency-ms 50 --frontier
+
+Prints one JSON document with listings/sec for every worker count.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer  # noqa: E402
+from Frontier import Frontier, work_job  # noqa: E402
+from main import MainScraper  # noqa: E402
+
+DEFAULT_CATEGORIES = [
+    ("Building or floors", "https://www.q84sale.com/en/property/for-sale/building-or-floors/{}", 1),
+    ("Apartment for Sale", "https://www.q84sale.com/en/property/for-sale/apartment-for-sale/{}", 2),
+    ("Property For Exchange", "https://www.q84sale.com/en/property/for-exchange/{}", 2),
+]
+
+
+def parse_category(text):
+    name, base_url, pages = text.split('|')
+    return name, base_url, int(pages)
+
+
+# Method to time one sharded run; the date window is off so every page is crawled
+def measure(categories, workers, fetch_mode):
+    scraper = MainScraper(categories, fetch_mode=fetch_mode, date_window=False)
+    start = time.perf_counter()
+    scraper.run_sharded(workers)
+    elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'pages': scraper.stats['pages'],
+        'listings': scraper.stats['listings'],
+        'listings_per_sec': round(scraper.stats['listings'] / elapsed, 3) if elapsed else 0.0,
+    }
+
+
+# Method to time worker processes draining one shared frontier, then the merge
+def measure_frontier(categories, workers, fetch_mode):
+    with tempfile.TemporaryDirectory() as directory:
+        job = {
+            'name': 'scaling',
+            'categories': [list(category) for category in categories],
+            'frontier_path': os.path.join(directory, 'frontier.sqlite3'),
+            'options': {'fetch_mode': fetch_mode, 'date_window': False},
+        }
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(work_job, job) for _ in range(workers)]:
+                future.result()
+        scraper = MainScraper(categories, fetch_mode=fetch_mode, date_window=False)
+        frontier = Frontier(job['frontier_path'])
+        scraper.collect_frontier(frontier)
+        frontier.close()
+        elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'pages': scraper.stats['pages'],
+        'listings': scraper.stats['listings'],
+        'listings_per_sec': round(scraper.stats['listings'] / elapsed, 3) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--category', action='append', type=parse_category,
+                        help='"name|base_url with {} for the page|pages"; repeatable')
+    parser.add_argument('--fetch-mode', default='browser', choices=['browser', 'http'])
+    parser.add_argument('--fixture', action='store_true', help='Crawl the local fixture server instead of the site')
+    parser.add_argument('--fixture-pages', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--frontier', action='store_true',
+                        help='Workers lease pages and details from a shared Frontier instead of fixed shards')
+    parser.add_argument('--output', help='Write the JSON report to this file as well')
+    args = parser.parse_args()
+
+    workers = sorted(set(args.workers))
+    measure_run = measure_frontier if args.frontier else measure
+    if args.fixture:
+        with FixtureServer(latency_ms=args.latency_ms) as server:
+            categories = [
+                (f"Fixture {index}", f"{server.url}/en/property/for-sale/fixture-{index}/{{}}", args.fixture_pages)
+                for index in range(1, max(workers) + 1)
+            ]
+            runs = [measure_run(categories, count, args.fetch_mode) for count in workers]
+    else:
+        categories = args.category or DEFAULT_CATEGORIES
+        runs = [measure_run(categories, count, args.fetch_mode) for count in workers]
+
+    baseline = runs[0]['listings_per_sec'] or None
+    for run in runs:
+        run['speedup'] = round(run['listings_per_sec'] / baseline, 2) if baseline else None
+
+    report = json.dumps({
+        'cpu_count': os.cpu_count(),
+        'fetch_mode': args.fetch_mode,
+        'mode': 'frontier' if args.frontier else 'sharded',
+        'runs': runs,
+    }, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(report)
+
+
+if __name__ == "__main__":
+    main()
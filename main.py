@@ -1,152 +1,495 @@
 import asyncio
-from playwright.async_api import async_playwright
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
 import nest_asyncio
+from BrowserPool import BrowserPool
+from Checkpoint import CheckpointJournal
 from DetailsScraper import DetailsScraping
+from CrawlScheduler import CrawlScheduler
+from CrawlStore import CrawlStore
+from DateWindow import DateWindow
+from DedupIndex import DedupIndex
+from Frontier import FrontierWorker
+from MemoryWatchdog import MemoryWatchdog
+from Metrics import metrics
+from Fetchers import build_fetchers
+from Records import RECORD_FIELDS, frame_rows, normalize_records, published_on, records_from_rows
+from Readiness import PageReadiness
+from RequestFilter import RequestFilter
+from ResponseCache import ResponseCache
+from RetryPolicy import CircuitBreaker, RetryPolicy
+from ResultSinks import JsonlSink, write_excel_from_spool
 import json
 import pandas as pd
 from datetime import datetime, timedelta
-from SavingOnDrive import SavingOnDrive
+from urllib.parse import urlparse
 
 
 class MainScraper:
-    def __init__(self, categories):
+    def __init__(self, categories, max_pages=8, detail_concurrency=4, fetch_mode='browser',
+                 date_window=True, store_path=None, store_ttl_hours=24, cache_dir=None, cache_mode='normal',
+                 spool_dir=None, sinks=None, rate_limit=4.0, dedup=None, checkpoint_path=None, pool=None,
+                 watchdog=None, memory_watchdog=True):
         self.categories = categories  # List of (name, base_url, pages)
-        self.results = {}  # Dictionary to store results for each category
+        self.results = {}  # Category -> DataFrame of kept records with typed columns
+        self.max_pages = max_pages  # Pages the shared browser pool keeps open at once
+        self.detail_concurrency = detail_concurrency  # Detail pages in flight per listing page
+        self.fetch_mode = fetch_mode  # 'browser', or 'http' with browser fallback
+        self.rate_limit = rate_limit  # Requests per second per host; concurrency adapts below max_pages
+        self.scheduler = None
+        self.date_window = date_window  # Skip cards outside yesterday and stop paginating past it
+        self.store_path = store_path  # SQLite file of listings seen by earlier runs (None disables it)
+        self.store_ttl_hours = store_ttl_hours  # Stored listings older than this are fetched again
+        self.store = None
+        self.cache_dir = cache_dir  # On-disk response cache directory (None disables it)
+        self.cache_mode = cache_mode  # 'normal', 'record' or 'replay' (offline rerun)
+        self.cache = None
+        self.pool = None
+        self.shared_pool = pool  # Warm BrowserPool owned by a long-lived process (e.g. ScraperDaemon)
+        # RSS watchdog of the shared pool's owner; with a pool of its own the crawl starts one unless disabled
+        self.watchdog = watchdog
+        self.memory_watchdog = memory_watchdog and os.environ.get('SCRAPER_MEMORY_WATCHDOG', '1') != '0'
+        self.memory = None  # Watchdog snapshot (peaks, throttles, restarts) of the last crawl
+        self.fetchers = None
 
-    async def scrape_category(self, name, base_url, pages):
-        all_properties = []
+        # With a spool, records stream to disk per page instead of accumulating in self.results
+        self.spool = JsonlSink(spool_dir) if spool_dir else None
+        self.sinks = list(sinks or [])  # Extra sinks (CSV, Parquet, ...) fed alongside the spool
+        self.stats = {'pages': 0, 'listings': 0, 'kept': 0, 'duplicates': 0}  # Throughput counters for the run
+        # Listing ids claimed so far; pass one index to several scrapers to dedupe across them too
+        self.dedup = dedup or DedupIndex()
+        self.readiness = PageReadiness()  # Per-page deadline budgets and slow-page reasons for the run
+        self.checkpoint_path = checkpoint_path  # Journal of finished pages; an interrupted run resumes from it
+        self.checkpoint = None
+        self.started_at = time.perf_counter()
+        self.first_record_seconds = None  # Time from the start of the run to the first emitted record
+
+    def _all_sinks(self):
+        return ([self.spool] if self.spool else []) + self.sinks
+
+    # Method to hand a finished page of records to the sinks (or keep them in memory)
+    def emit(self, name, frame, frames):
+        if frame is None or frame.empty:
+            return
+        if self.first_record_seconds is None:
+            self.first_record_seconds = time.perf_counter() - self.started_at
+            metrics.observe('time_to_first_record_seconds', self.first_record_seconds)
+        sinks = self._all_sinks()
+        if sinks:
+            rows = [self._add_provenance(row) for row in frame_rows(frame)]
+            for sink in sinks:
+                sink.write(name, rows)
+        if self.spool is None:
+            frames.append(frame)
+
+    # Method to attribute memory to the category while its pages are in flight
+    def memory_scope(self, name):
+        return self.watchdog.category(name) if self.watchdog is not None else nullcontext()
+
+    async def scrape_category(self, name, base_url, pages, first_page=1):
+        with self.memory_scope(name):
+            return await self._scrape_category(name, base_url, pages, first_page)
+
+    async def _scrape_category(self, name, base_url, pages, first_page):
+        frames = []  # Kept records per page, with typed columns
+        if first_page == 1:
+            for sink in self._all_sinks():
+                sink.begin(name)
         # Calculate yesterday's date in 'YYYY-MM-DD' format
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         print(f"Filtering properties published on: {yesterday}")
+        window = DateWindow.yesterday() if self.date_window else None
+        # Card links are relative to the site the category lives on
+        parsed = urlparse(base_url)
+        site_url = f"{parsed.scheme}://{parsed.netloc}"
 
-        for i in range(1, pages + 1):
+        # Retries are scoped to the failing page or card; the breaker pauses the category when the site fails
+        retry_policy = RetryPolicy(breaker=CircuitBreaker(name))
+
+        # `pages` is an upper bound; the crawl stops once a page is entirely older than the window
+        for i in range(first_page, pages + 1):
             url = base_url.format(i)
+            if self.checkpoint and self.checkpoint.is_done(name, i):
+                # Finished before an interruption: replay its records instead of scraping it again
+                entry = self.checkpoint.entry(name, i)
+                self.dedup.replay(entry['seen'], name, i)
+                self.emit(name, records_from_rows(entry['records']), frames)
+                if entry['exhausted']:
+                    break
+                continue
+
             print(f"Scraping page: {url} for category: {name}")
-            scraper = DetailsScraping(url)
+            scraper = DetailsScraping(
+                url, base_url=site_url, pool=self.pool, max_concurrency=self.detail_concurrency, fetchers=self.fetchers,
+                date_window=window, store=self.store, scheduler=self.scheduler, retry_policy=retry_policy,
+                dedup=self.dedup, source=(name, i), readiness=self.readiness,
+            )
             try:
-                properties = await scraper.get_property_details()
-                # Filter properties by published_date
-                filtered_properties = [
-                    prop for prop in properties
-                    if 'date_published' in prop and prop['date_published'].split(' ')[0] == yesterday
-                ]
-                if not filtered_properties:
+                with metrics.span('category_page_seconds', category=name):
+                    properties = await scraper.get_property_details()
+                self.stats['pages'] += 1
+                self.stats['listings'] += len(properties)
+                self.stats['duplicates'] += scraper.duplicates
+                # Typed columns for the whole page in one pass; the date filter is a column comparison
+                frame = normalize_records(properties)
+                filtered_properties = frame[published_on(frame, yesterday)]
+                if scraper.skipped:
+                    print(f"Skipped {scraper.skipped} cards outside {window} on page {i} for category {name}.")
+                if filtered_properties.empty:
                     print(f"No properties found on page {i} for category {name} with the specified date.")
-                all_properties.extend(filtered_properties)
+                self.stats['kept'] += len(filtered_properties)
+                metrics.inc('scraper_listings_total', len(properties), category=name)
+                metrics.inc('scraper_kept_total', len(filtered_properties), category=name)
+                self.emit(name, filtered_properties, frames)
+                if self.checkpoint and scraper.error is None:
+                    # A page that failed to load is not journaled, so a resumed run retries it
+                    self.checkpoint.record_page(
+                        name, i, frame_rows(filtered_properties[list(RECORD_FIELDS)]),
+                        self.dedup.held_by(scraper.seen_ids, name, i), scraper.page_exhausted,
+                    )
             except Exception as e:
                 print(f"Error scraping {url}: {e}")
+                continue
+
+            if scraper.page_exhausted:
+                print(f"Page {i} of category {name} is older than {window}; stopping pagination.")
+                break
 
-        if all_properties:
+        for sink in self._all_sinks():
+            sink.flush()
+        retry_policy.report(name)
+
+        all_properties = pd.concat(frames, ignore_index=True) if frames else normalize_records([])
+        if self.spool is not None:
+            if not self.spool.counts.get(name):
+                print(f"No data collected for category {name}.")
+        elif not all_properties.empty:
             self.results[name] = all_properties
         else:
             print(f"No data collected for category {name}.")
+        return all_properties
+
+    # Method to identify this run (day, categories), so state saved by another run is not mixed in
+    def run_key(self):
+        return {
+            'day': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
+            'categories': [[name, base_url, pages] for name, base_url, pages in self.categories],
+            'date_window': bool(self.date_window),
+        }
+
+    # Method to open the checkpoint journal for this run's day and categories
+    def open_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        self.checkpoint = CheckpointJournal(self.checkpoint_path, self.run_key()).open()
 
     async def run(self):
-        tasks = []
-        for name, base_url, pages in self.categories:
-            tasks.append(self.scrape_category(name, base_url, pages))
-        await asyncio.gather(*tasks)
+        self.started_at = time.perf_counter()
+        self.open_checkpoint()
+        try:
+            async with self._crawl_resources():
+                tasks = []
+                for name, base_url, pages in self.categories:
+                    tasks.append(self.scrape_category(name, base_url, pages))
+                await asyncio.gather(*tasks)
+        except BaseException:
+            if self.checkpoint:
+                self.checkpoint.close()  # Kept, so the next run resumes where this one stopped
+            raise
+
+        if self.checkpoint:
+            print(f"Replayed {self.checkpoint.resumed} pages from the checkpoint.")
+            self.checkpoint.complete()
+            self.checkpoint = None
+
+        self.dedup.report()
+        self.apply_provenance()
+        self.close_sinks()
+
+    # Method to add where else each kept listing appeared to its first record
+    def apply_provenance(self):
+        for frame in self.results.values():
+            frame['also_seen_in'] = frame['id'].map(self.dedup.provenance)
+
+    def _add_provenance(self, record):
+        record['also_seen_in'] = self.dedup.provenance(record.get('id'))
+        return record
+
+    # Method to close the sinks; records streamed before a listing's later sightings are rewritten with them
+    def close_sinks(self):
+        for sink in self._all_sinks():
+            sink.close()
+            if self.dedup.also_seen:
+                sink.rewrite(self._add_provenance)
+
+    # Method to scrape (name, base_url, first_page, last_page) shards, returning records per shard
+    async def run_shards(self, shards):
+        async with self._crawl_resources():
+            tasks = []
+            for name, base_url, first_page, last_page in shards:
+                tasks.append(self.scrape_category(name, base_url, last_page, first_page=first_page))
+            return await asyncio.gather(*tasks)
+
+    # Method to group whole categories into about one shard list per worker, balanced by page count;
+    # a category is never split, so its date-window stop still ends the crawl at the first stale page
+    def plan_shards(self, workers):
+        groups = [[] for _ in range(max(1, min(workers, len(self.categories))))]
+        loads = [0] * len(groups)
+        for name, base_url, pages in sorted(self.categories, key=lambda category: -category[2]):
+            index = loads.index(min(loads))
+            groups[index].append((name, base_url, 1, pages))
+            loads[index] += pages
+        return [group for group in groups if group]
+
+    def _worker_options(self):
+        return {
+            'max_pages': self.max_pages,
+            'detail_concurrency': self.detail_concurrency,
+            'fetch_mode': self.fetch_mode,
+            'rate_limit': self.rate_limit,
+            'date_window': self.date_window,
+            'store_path': self.store_path,
+            'store_ttl_hours': self.store_ttl_hours,
+            'cache_dir': self.cache_dir,
+            'cache_mode': self.cache_mode,
+            'memory_watchdog': self.memory_watchdog,
+        }
+
+    # Method to run the categories across worker processes, each with its own loop and browser
+    def run_sharded(self, workers=None):
+        workers = workers or os.cpu_count() or 1
+        self.started_at = time.perf_counter()
+        groups = self.plan_shards(workers)
+        shards = [shard for group in groups for shard in group]
+        if not shards:
+            print("No categories to run.")
+            self.close_sinks()
+            return
+        print(f"Running {len(shards)} categories across {len(groups)} worker processes.")
+
+        shard_records = {}
+        with ProcessPoolExecutor(max_workers=max(1, len(groups))) as executor:
+            futures = [executor.submit(scrape_shards, self._worker_options(), group) for group in groups]
+            for group, future in zip(groups, futures):
+                try:
+                    result = future.result()
+                    for shard, records in zip(group, result['records']):
+                        shard_records[shard] = records
+                    for key, value in result['stats'].items():
+                        self.stats[key] += value
+                    self.dedup.saved_fetches += result['stats']['duplicates']
+                    self.dedup.merge(result['also_seen'])
+                    # Worker timings are folded into this process's summary
+                    metrics.merge(result['metrics'])
+                except Exception as e:
+                    print(f"Worker failed for shards {group}: {e}")
+
+        # Merge shards back into page order for every category
+        for name, _, _ in self.categories:
+            for sink in self._all_sinks():
+                sink.begin(name)
+            frames = []
+            for shard in shards:
+                if shard[0] != name:
+                    continue
+                frame = shard_records.get(shard)
+                if frame is not None and not frame.empty:
+                    # A listing fetched by several workers is kept once, from the earliest shard
+                    pages = shard[2] if shard[2] == shard[3] else f"{shard[2]}-{shard[3]}"
+                    frame = frame[[self.dedup.claim(listing_id, name, pages, fetch=False) for listing_id in frame['id']]]
+                self.emit(name, frame, frames)
+            if frames:
+                self.results[name] = pd.concat(frames, ignore_index=True)
+
+        self.dedup.report()
+        self.apply_provenance()
+        self.close_sinks()
+
+    # Method to work through a shared Frontier until it is drained; any number of processes or
+    # machines can run this on the same frontier at once
+    async def run_frontier(self, frontier, worker_id=None, slots=None):
+        # Joins the run the frontier was seeded for when that run is still going
+        await asyncio.get_running_loop().run_in_executor(None, frontier.seed, self.categories, self.run_key())
+        async with self._crawl_resources():
+            worker = FrontierWorker(self, frontier, worker_id=worker_id, slots=slots)
+            await worker.run()
+        return worker.stats
+
+    # Method to build the results of a drained Frontier, page by page, the way run() leaves them
+    def collect_frontier(self, frontier):
+        self.started_at = time.perf_counter()
+        # Records are kept for the day the frontier was seeded for, not the day of the merge
+        yesterday = frontier.run_key()['day']
+        details = frontier.details()
+        for name, _, _ in self.categories:
+            for sink in self._all_sinks():
+                sink.begin(name)
+            frames = []
+            for page in frontier.pages(name):
+                if page['state'] == 'failed':
+                    print(f"Page {page['page']} of category {name} failed on every attempt: {page['error']}")
+                if page['state'] != 'done':
+                    continue
+                # Pages are claimed in parallel, so a listing is kept by its earliest page here, not at fetch time
+                cards = [card for card in page['cards'] if self.dedup.claim(card['id'], name, page['page'], fetch=False)]
+                self.stats['duplicates'] += len(page['cards']) - len(cards)
+                frame = normalize_records([
+                    DetailsScraping.build_record(card, dict(details.get(card['link']) or {})) for card in cards
+                ])
+                filtered_properties = frame[published_on(frame, yesterday)]
+                self.stats['pages'] += 1
+                self.stats['listings'] += len(cards)
+                self.stats['kept'] += len(filtered_properties)
+                self.emit(name, filtered_properties, frames)
+                if page['exhausted']:
+                    # Pages after this one may have been scraped before it finished; a single run stops here
+                    break
+            for sink in self._all_sinks():
+                sink.flush()
+            if frames:
+                self.results[name] = pd.concat(frames, ignore_index=True)
+            elif self.spool is None or not self.spool.counts.get(name):
+                print(f"No data collected for category {name}.")
+
+        self.dedup.report()
+        self.apply_provenance()
+        self.close_sinks()
+
+    # Method to borrow the warm shared pool, or open one for this crawl
+    @asynccontextmanager
+    async def _browser_pool(self, request_filter):
+        if self.shared_pool is not None:
+            yield self.shared_pool
+            return
+
+        async with BrowserPool(max_pages=self.max_pages, cache=self.cache, request_filter=request_filter) as pool:
+            yield pool
+
+    # Set up the browser pool, fetchers, store and cache shared by one crawl
+    @asynccontextmanager
+    async def _crawl_resources(self):
+        if self.cache_dir:
+            self.cache = ResponseCache(self.cache_dir, mode=self.cache_mode)
+
+        # One long-lived browser shared by every category and listing
+        request_filter = RequestFilter()
+        async with self._browser_pool(request_filter) as pool:
+            self.pool = pool
+            self.fetchers = build_fetchers(self.fetch_mode, cache=self.cache)
+            if self.store_path:
+                self.store = CrawlStore(self.store_path, ttl_hours=self.store_ttl_hours)
+            # Every page and detail fetch of every category goes through one scheduler
+            self.scheduler = CrawlScheduler(rate=self.rate_limit, max_concurrency=self.max_pages)
+            await self.scheduler.start()
+            # Throttles, trims and restarts the pool before Python plus Chromium run out of memory
+            own_watchdog = self.watchdog is None and self.shared_pool is None and self.memory_watchdog
+            if own_watchdog:
+                self.watchdog = MemoryWatchdog(pool)
+                await self.watchdog.start()
+            try:
+                yield
+            finally:
+                if own_watchdog:
+                    await self.watchdog.stop()
+                    self.watchdog.report()
+                    self.memory = self.watchdog.snapshot()
+                    self.watchdog = None
+                await self.scheduler.close()
+                self.scheduler.report()
+                self.scheduler = None
+                for backend in self.fetchers:
+                    await backend.close()
+                    backend.report()
+                if self.store:
+                    self.store.report()
+                    self.store.close()
+                self.pool = None
+                self.fetchers = None
+                self.store = None
+            pool.report()
+            request_filter.report()
+            self.readiness.report()
+
+        if self.cache:
+            self.cache.report()
+            self.cache.close()
+            self.cache = None
+
+    # Method to write every category to its own sheet, streaming from the spool when there is one;
+    # returns the number of sheets written
+    def _write_excel(self, file_name):
+        if self.spool is not None:
+            names = [name for name, _, _ in self.categories]
+            return write_excel_from_spool(
+                self.spool, names, file_name, transform=self._add_provenance, fields=RECORD_FIELDS
+            )
+
+        frames = {name: frame for name, frame in self.results.items() if not frame.empty}  # Only sheets with data
+        if not frames:
+            return 0
+        with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
+            for name, frame in frames.items():
+                frame.to_excel(writer, sheet_name=name, index=False)
+                print(f"Data for '{name}' saved to Excel.")
+        return len(frames)
 
     def save_to_excel(self, file_name):
         try:
-            with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
-                for name, properties in self.results.items():
-                    if properties:  # Only save sheets with data
-                        df = pd.DataFrame(properties)
-                        df.to_excel(writer, sheet_name=name, index=False)
-                        print(f"Data for '{name}' saved to Excel.")
-            print(f"All data successfully saved to {file_name}.")
+            with metrics.span('export_seconds', format='excel'):
+                written = self._write_excel(file_name)
+            if written:
+                print(f"All data successfully saved to {file_name}.")
+            else:
+                print(f"No data to save to {file_name}.")
+            return written
         except PermissionError:
             print(f"Error: Unable to save the file '{file_name}'. It may be open in another application.")
             backup_file_name = file_name.replace('.xlsx', '_backup.xlsx')
             print(f"Attempting to save data to '{backup_file_name}' instead.")
             try:
-                with pd.ExcelWriter(backup_file_name, engine='openpyxl') as writer:
-                    for name, properties in self.results.items():
-                        if properties:
-                            df = pd.DataFrame(properties)
-                            df.to_excel(writer, sheet_name=name, index=False)
-                            print(f"Data for '{name}' saved to backup file.")
-                print(f"All data successfully saved to {backup_file_name}.")
+                written = self._write_excel(backup_file_name)
+                if written:
+                    print(f"All data successfully saved to {backup_file_name}.")
+                return written
             except Exception as e:
                 print(f"Failed to save to backup file: {e}")
         except Exception as e:
             print(f"An unexpected error occurred while saving to Excel: {e}")
+        return 0
 
 
+# Runs in a worker process: a fresh event loop and browser for a group of shards
+def scrape_shards(options, shards):
+    # A forked worker starts with a copy of the parent's registry; only this worker's samples go back
+    metrics.reset()
+    scraper = MainScraper([], **options)
+    records = asyncio.run(scraper.run_shards(shards))
+    return {
+        'records': records,
+        'stats': scraper.stats,
+        'metrics': metrics.snapshot(),
+        'also_seen': scraper.dedup.also_seen,
+    }
+
+
+# Method to run one ScraperJobs job in this process; SCRAPER_WORKERS > 1 shards it across processes
+def run_job(job):
+    scraper = MainScraper(job['categories'], **job.get('options', {}))
+    workers = int(os.environ.get("SCRAPER_WORKERS", "1"))
+    if workers > 1:
+        scraper.run_sharded(workers)
+    else:
+        asyncio.run(scraper.run())
+    scraper.save_to_excel(job['excel_file'])
+    return scraper
+
 
 if __name__ == "__main__":
     nest_asyncio.apply()  # Ensure compatibility with nested event loops
 
-    # Define the scraping categories
-    categories_1 = [
-        # ("House for Sale", "https://www.q84sale.com/en/property/for-sale/house-for-sale/{}", 5),
-        ("Building or floors", "https://www.q84sale.com/en/property/for-sale/building-or-floors/{}", 1),
-        ("Apartment for Sale", "https://www.q84sale.com/en/property/for-sale/apartment-for-sale/{}", 2),
-        # ("Demolishing", "https://www.q84sale.com/en/property/for-sale/demolishing/{}", 1),
-        # ("Lounge for Sale", "https://www.q84sale.com/en/property/for-sale/lounge-for-sale/{}", 1),
-        # ("Chalet for Sale", "https://www.q84sale.com/en/property/for-sale/chalet-for-sale/{}", 1),
-        # ("Farms for Sale", "https://www.q84sale.com/en/property/for-sale/farms-for-sale/{}", 1),
-        # ("Land", "https://www.q84sale.com/en/property/for-sale/land/{}", 1),
-        # ("Residential Certificate", "https://www.q84sale.com/en/property/for-sale/residential-certificate/{}", 1),
-        # ("Commercial Land Certificate", "https://www.q84sale.com/en/property/for-sale/commercial-land-certificate/{}", 1),
-        # ("Shop for Sale", "https://www.q84sale.com/en/property/for-sale/shop-for-sale/{}", 2),
-        # ("Company", "https://www.q84sale.com/en/property/for-sale/company/{}", 1),
-        # ("Wanted Property for Sale", "https://www.q84sale.com/en/property/for-sale/wanted-property-for-sale/{}", 1),
-    ]
-
-    # categories_2 = [
-    #     ("House for Rent", "https://www.q84sale.com/en/property/for-rent/house-for-rent/{}", 2),
-    #     ("Floor", "https://www.q84sale.com/en/property/for-rent/floor/{}", 2),
-    #     ("Furnished Apartment", "https://www.q84sale.com/en/property/for-rent/furnished-apartment/{}", 1),
-    #     ("Apartment For Rent", "https://www.q84sale.com/en/property/for-rent/apartment-for-rent/{}", 7),
-    #     ("Duplex", "https://www.q84sale.com/en/property/for-rent/duplex/{}", 1),
-    #     ("House Sharing", "https://www.q84sale.com/en/property/for-rent/house-sharing/{}", 1),
-    #     ("Shop For Rent", "https://www.q84sale.com/en/property/for-rent/shop-for-rent/{}", 1),
-    #     ("Office", "https://www.q84sale.com/en/property/for-rent/office/{}", 1),
-    #     ("Stores", "https://www.q84sale.com/en/property/for-rent/stores/{}", 1),
-    #     ("Farms For Rent", "https://www.q84sale.com/en/property/for-rent/farms-for-rent/{}", 2),
-    #     ("Lounge For Rent", "https://www.q84sale.com/en/property/for-rent/lounge-for-rent/{}", 2),
-    #     ("Industrial Certificate", "https://www.q84sale.com/en/property/for-rent/industrial-certificate/{}", 1),
-    #     ("Chalet For Rent", "https://www.q84sale.com/en/property/for-rent/chalet-for-rent/{}", 2),
-    #     ("Rental Playgrounds", "https://www.q84sale.com/en/property/for-rent/rental-playgrounds/{}", 1),
-    #     ("Wanted Property for Rent", "https://www.q84sale.com/en/property/for-rent/wanted-property-for-rent/{}", 1),
-    # ]
-
-    categories_3 = [
-        ("Property For Exchange", "https://www.q84sale.com/en/property/for-exchange/{}", 2),
-    ]
-
-    # Create an instance of the scraper
-    PropertyForSale_scraper = MainScraper(categories_1)
-    # PropertyForRent_scraper = MainScraper(categories_2)
-    PropertyForExchange_scraper = MainScraper(categories_3)
-
-
-    # Run the scraper
-    asyncio.run(PropertyForSale_scraper.run())
-    # asyncio.run(PropertyForRent_scraper.run())
-    asyncio.run(PropertyForExchange_scraper.run())
-
-    # Save all results to an Excel file
-    excel_file_name_1 = "Property for Sale.xlsx"
-    # excel_file_name_2 = "Property for Rent.xlsx"
-    excel_file_name_3 = "Property For Exchange.xlsx"
-
-    PropertyForSale_scraper.save_to_excel(excel_file_name_1)
-    # PropertyForRent_scraper.save_to_excel(excel_file_name_2)
-    PropertyForExchange_scraper.save_to_excel(excel_file_name_3)
-
-    # Google Drive credentials file
-    credentials_file = "credentials/real-estate-property-scraper-4d9f71a7ded4.json"
-
-    # Initialize the SavingOnDrive class
-    drive_saver = SavingOnDrive(credentials_file)
-    drive_saver.authenticate()
-
-    # List of files to save
-    excel_files = [excel_file_name_1, excel_file_name_3] # , excel_file_name_2
-
-    # Save files to Google Drive
-    drive_saver.save_files(excel_files)
-
+    # The jobs live in ScraperJobs; they go to the warm daemon when one is running and run here otherwise.
+    # `python ScraperClient.py` does the same without importing Playwright or pandas up front.
+    from ScraperClient import run_jobs
+    run_jobs(local_runner=run_job)